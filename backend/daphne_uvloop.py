@@ -0,0 +1,21 @@
+"""
+Run Daphne on the uvloop event loop.
+
+Daphne creates its event loop as soon as daphne.server is imported, so the
+uvloop policy has to be installed before that import happens - doing it from
+backend/asgi.py would be too late. Accepts the same arguments as `daphne`.
+"""
+import sys
+
+try:
+    import uvloop
+except ImportError:  # Fall back to the default asyncio loop
+    uvloop = None
+
+
+if __name__ == '__main__':
+    if uvloop is not None:
+        uvloop.install()
+    
+    from daphne.cli import CommandLineInterface
+    sys.exit(CommandLineInterface.entrypoint())
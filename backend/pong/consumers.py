@@ -1,13 +1,17 @@
-import json
 import uuid
 import asyncio
+import heapq
 import logging
 import time
-import math
 import random
-import threading
+import struct
+import orjson
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from itertools import chain, islice
 from datetime import datetime
 from channels.generic.websocket import AsyncWebsocketConsumer
+from channels.layers import get_channel_layer
 from .game import PongGame
 
 from api.metrics import (
@@ -20,14 +24,323 @@ from api.metrics import (
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Global waiting list and mapping of channel_name to game room
-waiting_players = []
+# Global waiting queues and mapping of channel_name to game room
+waiting_by_rounds = defaultdict(dict)  # Maps rounds to waiting players by channel_name, oldest first
+waiting_rounds = {}  # Maps waiting channel_name to the rounds it queued for
 active_games = {}  # Maps channel_name to game room
+room_members = defaultdict(set)  # Maps game room to its channel_names
+binary_channels = set()  # Channels that asked for binary state frames
+room_binary_counts = defaultdict(int)  # Maps game room to how many members want binary frames
+
+# How long to wait for both players to acknowledge a tournament match start
+MATCH_ACK_TIMEOUT = 2.0
 
 # Tournament tracking
 active_tournaments = {}  # Maps tournament_id to Tournament object
 tournament_players = {}  # Maps channel_name to tournament_id
 
+# Cleanup of players whose disconnect cleanup never completed
+SWEEP_INTERVAL = 60  # Seconds between sweeps
+connected_channels = set()  # Channels with an open WebSocket
+sweep_task = None  # Background sweep task, started by the first connection
+
+
+def dumps(obj):
+    """Serialize a message to JSON text for a WebSocket frame"""
+    return orjson.dumps(obj).decode()
+
+
+# Binary game state frame for clients that opt in: seq (uint32), ball x/y/radius,
+# left and right paddle y/width/height (int16 in 1/STATE_SCALE pixels), left/right
+# score and field width/height (uint16), little-endian
+STATE_FRAME = struct.Struct("<I9h4H")
+STATE_SCALE = 32  # Sub-pixel steps per pixel; keeps an 800px field well inside int16
+
+
+def encode_state_frame(seq, state):
+    """Pack a full game state into a binary frame"""
+    ball = state["ball"]
+    left = state["paddles"]["left"]
+    right = state["paddles"]["right"]
+    positions = (
+        ball["x"], ball["y"], ball["radius"],
+        left["y"], left["width"], left["height"],
+        right["y"], right["width"], right["height"]
+    )
+    return STATE_FRAME.pack(
+        seq,
+        *(round(value * STATE_SCALE) for value in positions),
+        state["score"]["left"], state["score"]["right"],
+        state["dimensions"]["width"], state["dimensions"]["height"]
+    )
+
+
+def state_delta(state, last_state):
+    """Fields of a game state that moved since last_state, leaving out constant sizes"""
+    # Changed sections are new dicts, so identity is enough
+    delta = {}
+    ball = state["ball"]
+    if ball is not last_state["ball"]:
+        delta["ball"] = {"x": ball["x"], "y": ball["y"]}
+    paddles = state["paddles"]
+    if paddles is not last_state["paddles"]:
+        delta["paddles"] = {
+            side: {"y": paddle["y"]}
+            for side, paddle in paddles.items()
+            if paddle is not last_state["paddles"][side]
+        }
+    if state["score"] is not last_state["score"]:
+        delta["score"] = state["score"]
+    return delta
+
+
+def encode_tournament_error(message):
+    """Encode a tournament_error message for the client"""
+    return dumps({"type": "tournament_error", "message": message})
+
+
+# Pre-encoded tournament error messages, sent as-is to the client
+ERROR_INVALID_SIZE = encode_tournament_error("Tournament size must be 4, 6, or 8 players")
+ERROR_TOURNAMENT_NOT_FOUND = encode_tournament_error("Tournament not found")
+ERROR_ALREADY_STARTED = encode_tournament_error("Cannot join: Tournament has already started")
+ERROR_CANNOT_JOIN = encode_tournament_error("Cannot join tournament. It might be full or nickname is already taken.")
+ERROR_NOT_CREATOR = encode_tournament_error("Only the tournament creator can start the tournament")
+ERROR_NOT_IN_TOURNAMENT = encode_tournament_error("You are not in a tournament")
+ERROR_NEED_PLAYERS = encode_tournament_error("Cannot start: Need at least 4 players")
+ERROR_INVALID_PLAYER_COUNT = encode_tournament_error("Cannot start: Tournament requires 4, 6, or 8 players")
+ERROR_ODD_PLAYER_COUNT = encode_tournament_error("Cannot start: Need an even number of players")
+ERROR_CANNOT_START = encode_tournament_error("Cannot start tournament")
+
+# Pre-encoded tournament_left messages
+TOURNAMENT_LEFT = dumps({"type": "tournament_left", "message": "You have left the tournament"})
+TOURNAMENT_CANCELED = dumps({"type": "tournament_left", "message": "Tournament has been canceled by the creator."})
+
+# Channel layer operations run concurrently per batch in gather_sends
+FANOUT_BATCH = 32
+
+# Messages queued for a client while a write is in flight share one frame
+SEND_BATCH = 64  # Most messages written to a client in one frame
+
+# Game metrics are applied by a background task instead of inline in handlers
+metric_queue = asyncio.Queue()  # Pending metrics updates (callables)
+metric_task = None  # Collector task, started by the first update
+
+# Coalesced lobby broadcasts of the tournament list
+TOURNAMENT_LIST_DEBOUNCE = 0.05  # Seconds to collect changes before broadcasting
+tournament_list_task = None  # Pending broadcast task, if any
+tournament_list_dirty = False  # Whether the list changed since the last broadcast
+tournament_list_text = None  # Encoded tournament_list message, rebuilt after changes
+
+waiting_list_text = None  # Encoded waiting_list message, rebuilt after the queues change
+
+# Coalesced tournament_update broadcasts while players join and leave
+TOURNAMENT_UPDATE_DEBOUNCE = 0.05  # Seconds to collect roster changes before broadcasting
+
+
+async def gather_sends(sends, batch=FANOUT_BATCH):
+    """Run channel layer operations concurrently, logging any that fail"""
+    sends = iter(sends)
+    while True:
+        chunk = list(islice(sends, batch))
+        if not chunk:
+            break
+        
+        results = await asyncio.gather(*chunk, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Error sending channel layer message: {result}")
+        
+        # Let other consumers run between batches of a large fan-out
+        if len(chunk) == batch:
+            await asyncio.sleep(0)
+
+
+@dataclass(slots=True)
+class WaitingPlayer:
+    """A player queued for a regular match"""
+    channel: str
+    nickname: str
+    token: str
+    rounds: int
+
+
+@dataclass(slots=True)
+class TournamentPlayer:
+    """A player registered in a tournament"""
+    channel: str
+    nickname: str
+
+
+def record_metric(update):
+    """Queue a metrics update to be applied by the background collector"""
+    global metric_task
+    
+    metric_queue.put_nowait(update)
+    if metric_task is None:
+        metric_task = asyncio.create_task(collect_metrics())
+
+
+def record_game_started(game_mode):
+    """Metrics for a player whose game started"""
+    GAME_STARTED.labels(mode=game_mode).inc()
+    WAITING_PLAYERS.dec()
+    ACTIVE_PLAYERS.inc()
+
+
+def record_game_completed(game_mode):
+    """Metrics for a player whose game ended"""
+    GAME_COMPLETED.labels(mode=game_mode).inc()
+    ACTIVE_PLAYERS.dec()
+
+
+async def collect_metrics():
+    """Apply queued metrics updates, keeping Prometheus off the send path"""
+    while True:
+        update = await metric_queue.get()
+        try:
+            update()
+        except Exception as metrics_error:
+            # Don't let metrics recording failure affect the game
+            logger.warning(f"Failed to record game metrics: {metrics_error}")
+
+
+def get_tournament_list_text():
+    """Encoded tournament_list message, built once per change to the tournaments"""
+    global tournament_list_text
+    
+    if tournament_list_text is None:
+        tournament_list = [
+            {
+                "id": t_id,
+                "name": tournament.name,
+                "players": len(tournament.players),
+                "size": tournament.size,
+                "started": tournament.started
+            }
+            for t_id, tournament in active_tournaments.items()
+            if not tournament.started or tournament.current_match is not None
+        ]
+        tournament_list_text = dumps({"type": "tournament_list", "tournaments": tournament_list})
+    return tournament_list_text
+
+
+def invalidate_tournament_list():
+    """Drop the encoded tournament list after tournaments change"""
+    global tournament_list_text
+    tournament_list_text = None
+
+
+def get_waiting_list():
+    """Public view of the waiting players, as sent to the lobby"""
+    return [
+        {"nickname": p.nickname, "rounds": p.rounds}
+        for queue in waiting_by_rounds.values()
+        for p in queue.values()
+    ]
+
+
+def get_waiting_list_text():
+    """Encoded waiting_list message, built once per change to the queues"""
+    global waiting_list_text
+    
+    if waiting_list_text is None:
+        waiting_list_text = dumps({"type": "waiting_list", "waiting_list": get_waiting_list()})
+    return waiting_list_text
+
+
+def add_waiting_player(player):
+    """Queue a player for a match, replacing any entry its channel already had"""
+    global waiting_list_text
+    
+    remove_waiting_player(player.channel)
+    waiting_by_rounds[player.rounds][player.channel] = player
+    waiting_rounds[player.channel] = player.rounds
+    waiting_list_text = None
+
+
+def pop_waiting_player(rounds):
+    """Take the longest-waiting player queued for a number of rounds, if any"""
+    global waiting_list_text
+    
+    queue = waiting_by_rounds.get(rounds)
+    if not queue:
+        return None
+    
+    player = queue.pop(next(iter(queue)))
+    del waiting_rounds[player.channel]
+    if not queue:
+        del waiting_by_rounds[rounds]
+    waiting_list_text = None
+    return player
+
+
+def remove_waiting_player(channel_name):
+    """Remove a channel from the waiting queues, returning whether it was waiting"""
+    global waiting_list_text
+    
+    rounds = waiting_rounds.pop(channel_name, None)
+    if rounds is None:
+        return False
+    
+    queue = waiting_by_rounds[rounds]
+    queue.pop(channel_name, None)
+    if not queue:
+        del waiting_by_rounds[rounds]
+    waiting_list_text = None
+    return True
+
+
+def track_game_room(channel_name, game_room):
+    """Record that a channel is playing in a game room"""
+    previous_room = active_games.get(channel_name)
+    if previous_room == game_room:
+        return
+    if previous_room is not None:
+        untrack_game_room(channel_name)
+    
+    active_games[channel_name] = game_room
+    room_members[game_room].add(channel_name)
+    if channel_name in binary_channels:
+        room_binary_counts[game_room] += 1
+
+
+def untrack_game_room(channel_name):
+    """Forget a channel's game room, returning the room it was in (if any)"""
+    game_room = active_games.pop(channel_name, None)
+    if game_room is not None:
+        members = room_members.get(game_room)
+        if members is not None:
+            members.discard(channel_name)
+            if not members:
+                del room_members[game_room]
+        if channel_name in binary_channels:
+            set_room_binary_count(game_room, -1)
+    return game_room
+
+
+def set_binary_state(channel_name, enabled):
+    """Record a channel's state frame format, keeping its room's counts in step"""
+    if enabled == (channel_name in binary_channels):
+        return
+    
+    if enabled:
+        binary_channels.add(channel_name)
+    else:
+        binary_channels.discard(channel_name)
+    
+    game_room = active_games.get(channel_name)
+    if game_room is not None:
+        set_room_binary_count(game_room, 1 if enabled else -1)
+
+
+def set_room_binary_count(game_room, change):
+    """Adjust how many members of a room want binary frames"""
+    count = room_binary_counts[game_room] + change
+    if count > 0:
+        room_binary_counts[game_room] = count
+    else:
+        del room_binary_counts[game_room]
+
 class Tournament:
     """
     Enhanced tournament system for Pong matches.
@@ -35,15 +348,31 @@ class Tournament:
     """
     def __init__(self, id, creator_channel, name="Tournament", size=8):
         self.id = id
+        self.group_name = f"tourney_{id}"  # Channel layer group of all players
         self.name = name
         self.creator_channel = creator_channel
         self.size = size  # Total number of players (4, 6, or 8)
-        self.players = []  # List of {channel, nickname}
+        self.players = []  # List of TournamentPlayer, in join order
+        self.players_by_channel = {}  # Maps channel to its TournamentPlayer
+        self.nicknames = set()  # Nicknames taken in this tournament
         self.started = False
         self.rounds = 3  # Default rounds per match
+        self.bracket_rounds = 0  # Rounds in the bracket, set when the tournament starts
+        self.final_round = -1  # Round of the final match, set when the tournament starts
         self.matches = []  # All matches (past, current, upcoming)
+        self.match_by_rp = {}  # Maps (round, position) to its match
+        self.ready_matches = set()  # Ids of matches with both players known and no winner
+        self.ready_heap = []  # Heap of ready match ids, may hold ids no longer ready
         self.current_match = None  # Currently active match
         self.winner = None  # Tournament winner
+        self.match_room = None  # Game room of the match collecting acknowledgements
+        self.match_acks = set()  # Channels whose UI is ready for the current match
+        self.match_ack_event = asyncio.Event()  # Set once both players acknowledged
+        self.match_start_task = None  # Task starting the current match once acknowledged
+        self.state_cache = None  # get_state result, rebuilt after changes
+        self.update_text = None  # Encoded tournament_update message for state_cache
+        self.update_task = None  # Pending debounced tournament_update broadcast, if any
+        self.update_dirty = False  # Whether the roster changed since the last broadcast
     
     def add_player(self, channel, nickname):
         """Add a player to the tournament"""
@@ -52,34 +381,35 @@ class Tournament:
             return False
             
         # Check for duplicate nickname
-        if any(p["nickname"] == nickname for p in self.players):
+        if nickname in self.nicknames:
             return False
         
         # Check for existing channel
-        if any(p["channel"] == channel for p in self.players):
+        if channel in self.players_by_channel:
             return False
         
         # Check if tournament is full
         if len(self.players) >= self.size:
             return False
         
-        self.players.append({"channel": channel, "nickname": nickname})
+        player = TournamentPlayer(channel, nickname)
+        self.players.append(player)
+        self.players_by_channel[channel] = player
+        self.nicknames.add(nickname)
+        self.invalidate_state()
         return True
     
     def remove_player(self, channel):
         """Remove a player from the tournament"""
         # Find player to remove
-        player_to_remove = None
-        for p in self.players:
-            if p["channel"] == channel:
-                player_to_remove = p
-                break
-                
+        player_to_remove = self.players_by_channel.pop(channel, None)
         if not player_to_remove:
             return False
         
         # Remove player
         self.players.remove(player_to_remove)
+        self.nicknames.discard(player_to_remove.nickname)
+        self.invalidate_state()
         
         # If tournament has started, handle match updates
         if self.started and self.current_match:
@@ -119,20 +449,24 @@ class Tournament:
         
         # Reset tournament state
         self.matches = []
+        self.match_by_rp = {}
+        self.ready_matches = set()
+        self.ready_heap = []
         self.current_match = None
         self.winner = None
         
-        # Shuffle players for random matchups
-        shuffled_players = self.players.copy()
-        random.shuffle(shuffled_players)
+        # Random seeding in one pass; self.players keeps join order for display
+        shuffled_players = random.sample(self.players, len(self.players))
         
         # Calculate rounds needed based on player count
-        rounds_needed = math.ceil(math.log2(len(shuffled_players)))
+        self.bracket_rounds = (len(shuffled_players) - 1).bit_length()
+        self.final_round = self.bracket_rounds - 1
         
         # Create bracket structure
-        self.create_bracket(shuffled_players, rounds_needed)
+        self.create_bracket(shuffled_players, self.bracket_rounds)
         
         self.started = True
+        self.invalidate_state()
         
         # Start first match
         return self.advance_tournament()
@@ -141,81 +475,16 @@ class Tournament:
         """Create a tournament bracket structure based on player count"""
         player_count = len(players)
         
-        # Create initial round matches
-        first_round_matches = player_count // 2
-        
-        # Handle byes for non-power-of-2 player counts
-        if player_count & (player_count - 1) != 0:  # Not a power of 2
-            # Calculate how many byes we need
-            next_power_of_2 = 2 ** rounds
-            byes_needed = next_power_of_2 - player_count
-            
-            # Assign byes to certain positions (advance directly to next round)
-            # This is implemented by creating fewer first-round matches
-            first_round_matches = (player_count - byes_needed) // 2
-        
-        # Track all matches we need to create (round, position)
-        matches_to_create = []
-        final_round = rounds - 1  # 0-indexed
+        # Players beyond a full first round get a bye into the second round
+        byes_needed = (1 << rounds) - player_count
+        first_round_matches = (player_count - byes_needed) // 2
         
-        # First determine all match positions needed in bracket
+        # Create all matches round by round, so a match's id is its index
         for round_num in range(rounds):
-            matches_in_round = 2 ** (rounds - round_num - 1)
+            matches_in_round = 1 << (rounds - round_num - 1)
             for position in range(matches_in_round):
-                matches_to_create.append((round_num, position))
-        
-        # Sort by round so we create them in order
-        matches_to_create.sort(key=lambda x: x[0])
-        
-        # Create all matches, starting with round 0
-        match_id = 0
-        for round_num, position in matches_to_create:
-            # Determine if this is a first-round match
-            is_first_round = (round_num == 0)
-            
-            if is_first_round and position < first_round_matches:
-                # First round match with assigned players
-                player1_idx = position * 2
-                player2_idx = position * 2 + 1
-                
-                if player1_idx < len(players) and player2_idx < len(players):
-                    player1 = players[player1_idx]
-                    player2 = players[player2_idx]
-                    
-                    self.matches.append({
-                        "id": match_id,
-                        "round": round_num,
-                        "position": position,
-                        "player1": player1["nickname"],
-                        "player2": player2["nickname"],
-                        "player1_channel": player1["channel"],
-                        "player2_channel": player2["channel"],
-                        "winner": None,
-                        "next_match": self.calculate_next_match(round_num, position, first_round_matches)
-                    })
-                else:
-                    # This shouldn't happen, but handle it gracefully
-                    self.matches.append({
-                        "id": match_id,
-                        "round": round_num,
-                        "position": position,
-                        "player1": "TBD",
-                        "player2": "TBD",
-                        "player1_channel": None,
-                        "player2_channel": None,
-                        "winner": None,
-                        "next_match": self.calculate_next_match(round_num, position, first_round_matches)
-                    })
-            else:
-                # Higher round match (including final) - will be filled later
-                # For 4 players, this includes the final match (round 1, position 0)
-                next_match = None
-                if round_num < final_round:
-                    matches_in_this_round = 2 ** (rounds - round_num - 1)
-                    next_match = self.calculate_next_match(round_num, position, matches_in_this_round)
-                
-                self.matches.append({
-                    "id": match_id,
+                match = {
+                    "id": len(self.matches),
                     "round": round_num,
                     "position": position,
                     "player1": None,  # Will be filled by winner of previous match
@@ -223,31 +492,47 @@ class Tournament:
                     "player1_channel": None,
                     "player2_channel": None,
                     "winner": None,
-                    "next_match": next_match
-                })
-            
-            match_id += 1
-        
-        # Special handling for byes - check if we have players who get byes
-        if player_count & (player_count - 1) != 0:  # Not a power of 2
-            bye_players = players[first_round_matches * 2:]
-            for i, player in enumerate(bye_players):
-                # Calculate position in second round
-                round_idx = 1  # Second round (0-indexed)
-                position = i // 2
+                    "next_match": self.calculate_next_match(round_num, position, matches_in_round)
+                }
                 
-                # Find the corresponding match in the second round
-                second_round_match = next((m for m in self.matches 
-                                        if m["round"] == round_idx and m["position"] == position), None)
+                if round_num == 0 and position < first_round_matches:
+                    # First round match with assigned players
+                    player1 = players[position * 2]
+                    player2 = players[position * 2 + 1]
+                    match["player1"] = player1.nickname
+                    match["player2"] = player2.nickname
+                    match["player1_channel"] = player1.channel
+                    match["player2_channel"] = player2.channel
                 
-                if second_round_match:
-                    # Add player to first or second slot
-                    if second_round_match["player1"] is None:
-                        second_round_match["player1"] = player["nickname"]
-                        second_round_match["player1_channel"] = player["channel"]
-                    else:
-                        second_round_match["player2"] = player["nickname"]
-                        second_round_match["player2_channel"] = player["channel"]
+                self.matches.append(match)
+                self.match_by_rp[(round_num, position)] = match
+        
+        # Bye players take the second-round slots after those fed by the
+        # first-round winners
+        bye_players = players[first_round_matches * 2:]
+        for slot, player in enumerate(bye_players, first_round_matches):
+            second_round_match = self.match_by_rp.get((1, slot // 2))
+            
+            if second_round_match:
+                # Add player to first or second slot
+                if second_round_match["player1"] is None:
+                    second_round_match["player1"] = player.nickname
+                    second_round_match["player1_channel"] = player.channel
+                else:
+                    second_round_match["player2"] = player.nickname
+                    second_round_match["player2_channel"] = player.channel
+        
+        for match in self.matches:
+            self.update_ready(match)
+    
+    def update_ready(self, match):
+        """Keep ready_matches in step with a match's players and winner"""
+        if match["player1_channel"] and match["player2_channel"] and match["winner"] is None:
+            if match["id"] not in self.ready_matches:
+                self.ready_matches.add(match["id"])
+                heapq.heappush(self.ready_heap, match["id"])
+        else:
+            self.ready_matches.discard(match["id"])
     
     def calculate_next_match(self, current_round, position, matches_in_round):
         """Calculate the ID of the next match in the bracket"""
@@ -265,36 +550,17 @@ class Tournament:
         if self.current_match:
             return False
             
-        # Find the next match to play
+        # Find the next match to play; the final becomes ready like any
+        # other match once both of its players are known
         next_match = self.find_next_match()
         
-        if not next_match:
-            # No available match, but check for a special case:
-            # - First round matches are done
-            # - Final match should be created but hasn't been activated
-            
-            # Find the final round by checking bracket depth
-            final_round = math.ceil(math.log2(len(self.players))) - 1
-            
-            # Find matches where both players are known but winner is None
-            final_matches = [m for m in self.matches 
-                        if m["round"] == final_round and m["winner"] is None
-                        and m["player1"] and m["player2"]
-                        and m["player1_channel"] and m["player2_channel"]]
-                        
-            # If we have a potential final match that's ready to play
-            if final_matches and len(final_matches) == 1:
-                next_match = final_matches[0]
-                logger.info(f"Found final match ready to play: {next_match['player1']} vs {next_match['player2']}")
-        
         if not next_match:
             # Tournament is complete or no valid next match
             # Find the winner (winner of the final match)
-            final_round = math.ceil(math.log2(len(self.players))) - 1
-            final_match = next((m for m in self.matches 
-                            if m["round"] == final_round and m["winner"] is not None), None)
-            if final_match:
+            final_match = self.match_by_rp.get((self.final_round, 0))
+            if final_match and final_match["winner"] is not None and self.winner is None:
                 self.winner = final_match["winner"]
+                self.invalidate_state()
             
             return False
         
@@ -305,24 +571,18 @@ class Tournament:
         
         # Set as current match
         self.current_match = next_match
+        self.invalidate_state()
         logger.info(f"Advanced tournament to match: {next_match['player1']} vs {next_match['player2']}")
         return True
     
     def find_next_match(self):
         """Find the next match that's ready to be played"""
-        # First, look for matches where both players are known and no winner yet
-        ready_matches = []
-        for match in self.matches:
-            if (match["player1"] and match["player2"] and 
-                match["player1_channel"] and match["player2_channel"] and
-                match["winner"] is None):
-                ready_matches.append(match)
-        
-        # Sort matches by round (lower rounds first)
-        ready_matches.sort(key=lambda m: m["round"])
+        # Ids follow round then bracket order, so the smallest ready id is
+        # the next match; ids that stopped being ready are dropped here
+        while self.ready_heap and self.ready_heap[0] not in self.ready_matches:
+            heapq.heappop(self.ready_heap)
         
-        # Return the first available match if any
-        return ready_matches[0] if ready_matches else None
+        return self.matches[self.ready_heap[0]] if self.ready_heap else None
     
     def record_match_result(self, winner_channel):
         """Record the result of the current match"""
@@ -352,15 +612,15 @@ class Tournament:
         
         # Update current match with winner
         self.current_match["winner"] = winner_nickname
+        self.ready_matches.discard(self.current_match["id"])
+        self.invalidate_state()
         
         # Update next match if there is one
         if self.current_match["next_match"]:
             next_round = self.current_match["next_match"]["round"]
             next_position = self.current_match["next_match"]["position"]
             
-            # Find the next match
-            next_match = next((m for m in self.matches 
-                            if m["round"] == next_round and m["position"] == next_position), None)
+            next_match = self.match_by_rp.get((next_round, next_position))
             
             if next_match:
                 # Determine which player slot to fill
@@ -370,37 +630,17 @@ class Tournament:
                 else:
                     next_match["player2"] = winner_nickname
                     next_match["player2_channel"] = winner_channel
+                self.update_ready(next_match)
         
         # Store current match for return value
         current_match = self.current_match
         
-        # Clear current match BEFORE calling advance_tournament
-        # This is important to avoid potential issues
+        # Clear current match so advance_tournament can pick the next one
         self.current_match = None
         
-        # Force the tournament to advance after a short delay
-        # This ensures all match updates are processed before advancing
-        import asyncio
-        async def delayed_advance():
-            await asyncio.sleep(0.5)
-            # Try to advance the tournament
-            if not self.advance_tournament() and not self.winner:
-                # If advance_tournament didn't work or set a winner, check for final match manually
-                final_matches = [m for m in self.matches if m["next_match"] is None]
-                if final_matches and len(final_matches) == 1 and final_matches[0]["player1"] and final_matches[0]["player2"]:
-                    # We have a valid final match that should be set as current
-                    self.current_match = final_matches[0]
-                    logger.info(f"Forcing final match: {self.current_match['player1']} vs {self.current_match['player2']}")
-        
-        # Schedule the delayed advancement (will be executed by the event loop)
-        asyncio.create_task(delayed_advance())
-        
-        # Calculate if tournament is complete
-        if not self.advance_tournament() and not self.winner:
-            # Find if we have a winner
-            final_match = next((m for m in self.matches if m["next_match"] is None and m["winner"] is not None), None)
-            if final_match:
-                self.winner = final_match["winner"]
+        # The bracket is already updated, so this either starts the next
+        # match or records the tournament winner
+        self.advance_tournament()
         
         # Return the match result for notifications
         return {
@@ -412,8 +652,60 @@ class Tournament:
             "tournament_complete": self.winner is not None
         }
     
+    def current_opponent(self, channel):
+        """The channel a player faces in the current match, or None if not playing"""
+        if not self.current_match:
+            return None
+        
+        if channel == self.current_match["player1_channel"]:
+            return self.current_match["player2_channel"]
+        if channel == self.current_match["player2_channel"]:
+            return self.current_match["player1_channel"]
+        return None
+    
+    def reset_match_acks(self, game_room):
+        """Prepare to collect acknowledgements for a new match in a game room"""
+        self.match_room = game_room
+        self.match_acks.clear()
+        self.match_ack_event.clear()
+    
+    def ack_match(self, channel, game_room):
+        """Record that a player's UI is ready for the current match"""
+        if not self.current_match:
+            return False
+        
+        # A late ack for an earlier match must not count toward this one
+        if game_room is None or game_room != self.match_room:
+            return False
+        
+        if channel not in (self.current_match["player1_channel"], self.current_match["player2_channel"]):
+            return False
+        
+        self.match_acks.add(channel)
+        if len(self.match_acks) == 2:
+            self.match_ack_event.set()
+        return True
+    
+    def invalidate_state(self):
+        """Drop the cached get_state result after a change"""
+        self.state_cache = None
+        self.update_text = None
+    
+    def get_update_text(self):
+        """Encoded tournament_update message, built once per change"""
+        if self.update_text is None:
+            self.update_text = dumps({"type": "tournament_update", "tournament": self.get_state()})
+        return self.update_text
+    
     def get_state(self):
-        """Get the current state of the tournament for clients"""
+        """Get the current state of the tournament for clients
+        
+        The dict is cached until the tournament changes, so callers must
+        not modify it.
+        """
+        if self.state_cache is not None:
+            return self.state_cache
+        
         # Format current match data
         current_match_data = None
         if self.current_match:
@@ -423,7 +715,7 @@ class Tournament:
             }
         
         # Format player list
-        players = [p["nickname"] for p in self.players]
+        players = [p.nickname for p in self.players]
         
         # Get match data for bracket display
         matches_data = []
@@ -437,7 +729,7 @@ class Tournament:
             }
             matches_data.append(match_data)
         
-        return {
+        self.state_cache = {
             "id": self.id,
             "name": self.name,
             "size": self.size,
@@ -447,6 +739,7 @@ class Tournament:
             "matches": matches_data,
             "winner": self.winner
         }
+        return self.state_cache
 
 
 class GameManager:
@@ -456,90 +749,83 @@ class GameManager:
     def __init__(self):
         self.active_games = {}  # Maps room_id to PongGame instance
         self.player_games = {}  # Maps player channel_name to room_id
-        self.lock = threading.Lock()
     
     def create_game(self, room_id, target_rounds=3):
         """Create a new game"""
-        with self.lock:
-            if room_id in self.active_games:
-                return self.active_games[room_id]
-            
-            game = PongGame(
-                room_id=room_id,
-                target_rounds=target_rounds,
-                on_game_over=self.handle_game_over
-            )
-            self.active_games[room_id] = game
+        game = self.active_games.get(room_id)
+        if game is not None:
             return game
+        
+        game = PongGame(
+            room_id=room_id,
+            target_rounds=target_rounds,
+            on_game_over=self.handle_game_over
+        )
+        self.active_games[room_id] = game
+        return game
     
     def add_player_to_game(self, room_id, channel_name, player_side=None):
         """Add a player to a game"""
-        with self.lock:
-            game = self.active_games.get(room_id)
-            if not game:
-                return None
-            
-            side = game.add_player(channel_name, player_side)
-            if side:
-                self.player_games[channel_name] = room_id
-            return side
+        game = self.active_games.get(room_id)
+        if not game:
+            return None
+        
+        side = game.add_player(channel_name, player_side)
+        if side:
+            self.player_games[channel_name] = room_id
+        return side
     
     def remove_player_from_game(self, channel_name):
         """Remove a player from their game"""
-        with self.lock:
-            room_id = self.player_games.get(channel_name)
-            if not room_id:
-                return False
-            
-            game = self.active_games.get(room_id)
-            if not game:
-                return False
-            
-            result = game.remove_player(channel_name)
-            if result:
-                del self.player_games[channel_name]
-                
-                # Check if game is now empty
-                if game.left_player is None and game.right_player is None:
-                    game.stop()
-                    del self.active_games[room_id]
+        room_id = self.player_games.get(channel_name)
+        if not room_id:
+            return False
+        
+        game = self.active_games.get(room_id)
+        if not game:
+            return False
+        
+        result = game.remove_player(channel_name)
+        if result:
+            del self.player_games[channel_name]
             
-            return result
+            # Check if game is now empty
+            if game.left_player is None and game.right_player is None:
+                game.stop()
+                del self.active_games[room_id]
+        
+        return result
     
     def update_paddle(self, channel_name, y_position):
         """Update paddle position for a player"""
-        with self.lock:
-            room_id = self.player_games.get(channel_name)
-            if not room_id:
-                return False
-            
-            game = self.active_games.get(room_id)
-            if not game:
-                return False
-            
-            game.update_paddle(channel_name, y_position)
-            return True
+        room_id = self.player_games.get(channel_name)
+        if not room_id:
+            return False
+        
+        game = self.active_games.get(room_id)
+        if not game:
+            return False
+        
+        return game.update_paddle(channel_name, y_position)
     
     def get_game_for_player(self, channel_name):
         """Get the game instance for a player"""
-        with self.lock:
-            room_id = self.player_games.get(channel_name)
-            if not room_id:
-                return None
-            
-            return self.active_games.get(room_id)
+        room_id = self.player_games.get(channel_name)
+        if not room_id:
+            return None
+        
+        return self.active_games.get(room_id)
     
     def start_game(self, room_id):
         """Start a game if both players are ready"""
-        with self.lock:
-            game = self.active_games.get(room_id)
-            if not game:
-                return False
-            
-            if game.left_player and game.right_player:
-                return game.start()
-            
+        game = self.active_games.get(room_id)
+        if not game:
             return False
+        
+        if game.left_player and game.right_player:
+            return game.start()
+        
+        return False
     
     def handle_game_over(self, game):
         """Handle game over event"""
@@ -548,521 +834,823 @@ class GameManager:
         logger.info(f"Game over: room={game.room_id}, winner={game.winner}")
         
         # Schedule cleanup after a delay (would use proper cleanup mechanism in production)
-        def delayed_cleanup():
-            time.sleep(5)  # 5 second delay before cleanup
-            with self.lock:
-                if game.room_id in self.active_games:
-                    del self.active_games[game.room_id]
-        
-        # Start cleanup thread
-        cleanup_thread = threading.Thread(target=delayed_cleanup)
-        cleanup_thread.daemon = True
-        cleanup_thread.start()
+        asyncio.get_running_loop().call_later(5, self.active_games.pop, game.room_id, None)
 
 
 # Create a global game manager instance
 game_manager = GameManager()
 
 
-class PongConsumer(AsyncWebsocketConsumer):
-    async def connect(self):
-        await self.accept()
-        WEBSOCKET_CONNECTIONS.inc()
-        
-        # Add every connecting client to a common lobby group
-        await self.channel_layer.group_add("lobby", self.channel_name)
-        logger.info(f"WebSocket connected: {self.channel_name}")
-        
-        # Send waiting list update
-        await self.send(text_data=json.dumps({
-            "type": "waiting_list",
-            "waiting_list": [
-                {"nickname": p["nickname"], "rounds": p["rounds"]}
-                for p in waiting_players
-            ]
-        }))
-        
-        # Send active tournaments list
-        await self.broadcast_tournament_list()
-
-    async def disconnect(self, close_code):
-        WEBSOCKET_CONNECTIONS.dec()
-        global waiting_players, active_games, tournament_players, active_tournaments
-        logger.info(f"WebSocket disconnecting: {self.channel_name}")
-        
-        # Remove from waiting players
-        waiting_players[:] = [p for p in waiting_players if p["channel"] != self.channel_name]
-        
-        # Broadcast updated waiting list
-        await self.broadcast_waiting_list()
-        
-        # Handle tournament cleanup when player disconnects
-        if self.channel_name in tournament_players:
-            tournament_id = tournament_players[self.channel_name]
-            logger.info(f"Player in tournament {tournament_id} is disconnecting")
-            
-            if tournament_id in active_tournaments:
-                tournament = active_tournaments[tournament_id]
-                
-                # If this was the creator and tournament hasn't started, remove it entirely
-                if tournament.creator_channel == self.channel_name and not tournament.started:
-                    logger.info(f"Creator left tournament {tournament_id} - removing tournament")
-                    
-                    # Notify all players in this tournament
-                    for player in tournament.players:
-                        if player["channel"] != self.channel_name:  # Don't send to the leaving player
-                            try:
-                                await self.channel_layer.send(
-                                    player["channel"],
-                                    {
-                                        "type": "tournament_left",
-                                        "message": "Tournament has been canceled by the creator."
-                                    }
-                                )
-                                # Also remove from tournament tracking
-                                if player["channel"] in tournament_players:
-                                    del tournament_players[player["channel"]]
-                            except Exception as e:
-                                logger.error(f"Error notifying player about tournament deletion: {e}")
-                    
-                    # Delete the tournament
-                    del active_tournaments[tournament_id]
-                else:
-                    # Remove this player from the tournament
-                    if tournament.remove_player(self.channel_name):
-                        logger.info(f"Removed player from tournament {tournament_id}")
-                        
-                        # Notify other tournament players about the update
-                        for player in tournament.players:
-                            try:
-                                await self.channel_layer.send(
-                                    player["channel"],
-                                    {
-                                        "type": "tournament_update",
-                                        "tournament": tournament.get_state()
-                                    }
-                                )
-                            except Exception as e:
-                                logger.error(f"Error sending tournament update: {e}")
-                        
-                        # If tournament is now empty, remove it
-                        if not tournament.players:
-                            logger.info(f"Tournament {tournament_id} is now empty - removing")
-                            del active_tournaments[tournament_id]
-            
-            # Remove the player from tournament tracking
-            del tournament_players[self.channel_name]
-            
-            # Broadcast updated tournament list
-            await self.broadcast_tournament_list()
-        
-        # Handle game room leave
-        game_room = active_games.get(self.channel_name)
-        if game_room:
-            # Remove player from server-side game
-            game_manager.remove_player_from_game(self.channel_name)
-            
-            await self.channel_layer.group_discard(game_room, self.channel_name)
-            
-            # Notify opponents in the same game room
-            for channel, room in list(active_games.items()):
-                if room == game_room and channel != self.channel_name:
-                    await self.channel_layer.send(
-                        channel,
-                        {
-                            "type": "opponent_left",
-                            "message": "Your opponent has disconnected."
-                        }
-                    )
-                    # Remove their game tracking
-                    if channel in active_games:
-                        del active_games[channel]
-            
-            # Remove self from active games
-            if self.channel_name in active_games:
-                del active_games[self.channel_name]
+class GameSyncDriver:
+    """
+    Pushes the state of every running game to its room from a single task
+    """
+    def __init__(self, interval=1/30, keyframe_interval=30):
+        self.interval = interval  # ~ 30 updates per second, clients interpolate between them
+        self.keyframe_interval = keyframe_interval  # Ticks between full state sends
+        self.rooms = {}  # Maps room_id to the time syncing started
+        self.games = {}  # Maps room_id to its PongGame, looked up once per room
+        self.last_states = {}  # Maps room_id to the last state sent
+        self.events = {}  # Maps room_id to its reusable group_send event
+        self.task = None
+    
+    def add_room(self, room_id):
+        """Start syncing a room, starting the shared loop if it is idle"""
+        game = game_manager.active_games.get(room_id)
+        if not game:
+            logger.error(f"Game not found in game_manager.active_games for room: {room_id}")
+            return
         
-        # Remove from lobby group
-        await self.channel_layer.group_discard("lobby", self.channel_name)
-        logger.info(f"WebSocket disconnected: {self.channel_name}")
-
-    async def start_tournament_match(self, tournament, match):
-        """Start a match within a tournament"""
-        player1_channel = match["player1_channel"]
-        player2_channel = match["player2_channel"]
-        player1_nickname = match["player1"]
-        player2_nickname = match["player2"]
-        
-        logger.info(f"Starting tournament match: {player1_nickname} vs {player2_nickname}")
-        
-        # Create a new game room for this match
-        tourney_game_room = "tourney_game_" + str(uuid.uuid4())
-        
-        # Create server-side game
-        game = game_manager.create_game(tourney_game_room, target_rounds=tournament.rounds)
-        
-        # Add players to the game
-        left_side = game_manager.add_player_to_game(tourney_game_room, player1_channel, "left")
-        right_side = game_manager.add_player_to_game(tourney_game_room, player2_channel, "right")
-        
-        if not left_side or not right_side:
-            logger.error(f"Failed to add players to tournament game - left: {left_side}, right: {right_side}")
-            # Try to recover
-            if not left_side:
-                logger.error(f"Trying to re-add player1 {player1_nickname} to game")
-                game_manager.add_player_to_game(tourney_game_room, player1_channel, "left")
-            if not right_side:
-                logger.error(f"Trying to re-add player2 {player2_nickname} to game")
-                game_manager.add_player_to_game(tourney_game_room, player2_channel, "right")
-        
-        logger.info(f"Added players to tournament game: left={player1_channel}, right={player2_channel}")
-        
-        # Add to channel group
-        await self.channel_layer.group_add(tourney_game_room, player1_channel)
-        await self.channel_layer.group_add(tourney_game_room, player2_channel)
-        
-        # Store room mapping
-        active_games[player1_channel] = tourney_game_room
-        active_games[player2_channel] = tourney_game_room
-        
-        # Start the game with a small delay to ensure players are ready
-        await asyncio.sleep(0.5)
-        success = game_manager.start_game(tourney_game_room)
-        if not success:
-            logger.error(f"Failed to start tournament game: {tourney_game_room}")
-            # Try once more after a short delay
-            await asyncio.sleep(1.0)
-            success = game_manager.start_game(tourney_game_room)
-            if not success:
-                logger.error(f"Failed second attempt to start tournament game: {tourney_game_room}")
-                return
-        
-        logger.info(f"Tournament game started: {success}")
-        
-        # Set up state sync loop for this game
-        asyncio.create_task(self.game_sync_loop(tourney_game_room))
-        
-        # Start game for both players
-        match_message = f"Tournament match: {player1_nickname} vs {player2_nickname}"
-        
-        await self.channel_layer.send(
-            player1_channel,
-            {
-                "type": "start_game",
-                "message": match_message,
-                "room": tourney_game_room,
-                "rounds": tournament.rounds,
-                "is_tournament": True,
-                "player_side": "left"
-            }
-        )
+        self.games[room_id] = game
+        self.rooms[room_id] = time.time()
+        logger.info(f"Starting game sync for room: {room_id}")
         
-        # Add small delay between messages to prevent race conditions
-        await asyncio.sleep(0.1)
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+    
+    async def run(self):
+        """Send one state update per running room every tick"""
+        channel_layer = get_channel_layer()
+        loop = asyncio.get_running_loop()
+        start_time = time.time()
+        sync_count = 0
         
-        await self.channel_layer.send(
-            player2_channel,
-            {
-                "type": "start_game",
-                "message": match_message,
-                "room": tourney_game_room,
-                "rounds": tournament.rounds,
-                "is_tournament": True,
-                "player_side": "right"
-            }
-        )
-
-    async def receive(self, text_data):
-        global waiting_players, active_games, tournament_players, active_tournaments
+        # Ticks are scheduled against fixed deadlines so the time spent
+        # sending doesn't stretch the period
+        deadline = loop.time()
         
         try:
-            data = json.loads(text_data)
-            msg_type = data.get("type")
-            WEBSOCKET_MESSAGES.labels(message_type=msg_type).inc()
-            logger.debug(f"Received message type: {msg_type}")
-            
-            # Regular game matchmaking
-            if msg_type == "join":
-                WAITING_PLAYERS.inc()
-                nickname = data.get("nickname")
-                token = data.get("token")
-                rounds = data.get("rounds")
-                logger.info(f"Player {nickname} joined with token: {token} and rounds: {rounds}")
+            while self.rooms:
+                sends = []
                 
-                # Search for a waiting player with the same rounds
-                matching_player = None
-                for player in waiting_players:
-                    if player["rounds"] == rounds:
-                        matching_player = player
-                        break
-                        
-                if matching_player:
-                    waiting_players.remove(matching_player)
-                    game_room = "game_" + str(uuid.uuid4())
-                    
-                    # Create server-side game
-                    game = game_manager.create_game(game_room, target_rounds=rounds)
-                    
-                    # Add players to the game
-                    game_manager.add_player_to_game(game_room, matching_player["channel"], "left")
-                    game_manager.add_player_to_game(game_room, self.channel_name, "right")
-                    
-                    # Add to channel group
-                    await self.channel_layer.group_add(game_room, self.channel_name)
-                    await self.channel_layer.group_add(game_room, matching_player["channel"])
-                    
-                    # Store room mapping
-                    active_games[self.channel_name] = game_room
-                    active_games[matching_player["channel"]] = game_room
-                    
-                    # Construct message
-                    game_message = f"Game starting between {matching_player['nickname']} and {nickname}"
+                for room_id, game in list(self.games.items()):
+                    if not game.is_running:
+                        logger.info(f"Game in room {room_id} is no longer running")
+                        # Check if game has a winner and notify players
+                        if game.winner:
+                            logger.info(f"Game in room {room_id} has winner: {game.winner}")
+                            if game.winner == "left":
+                                winner_score = game.left_score
+                            else:
+                                winner_score = game.right_score
+                            sends.append(channel_layer.group_send(room_id, {
+                                "type": "broadcast_game_over",
+                                "score": winner_score,
+                                "winner": game.winner
+                            }))
+                        else:
+                            logger.warning(f"Game in room {room_id} stopped without a winner")
+                        self.remove_room(room_id)
+                        continue
                     
-                    # Start the game
-                    game_manager.start_game(game_room)
+                    # Nobody left to watch once a player has left the match
+                    if game.left_player is None or game.right_player is None:
+                        logger.info(f"Player left game in room {room_id}, stopping sync")
+                        self.remove_room(room_id)
+                        continue
                     
-                    # Set up state sync loop for this game
-                    asyncio.create_task(self.game_sync_loop(game_room))
+                    # Nothing to send while nobody is subscribed to the room
+                    if not room_members.get(room_id):
+                        continue
                     
-                    # Notify players
-                    await self.channel_layer.send(
-                        matching_player["channel"],
-                        {
-                            "type": "start_game",
-                            "message": game_message,
-                            "room": game_room,
-                            "rounds": rounds,
-                            "player_side": "left"
-                        }
-                    )
-                    await self.send(text_data=json.dumps({
-                        "type": "start_game",
-                        "message": game_message,
-                        "room": game_room,
-                        "rounds": rounds,
-                        "player_side": "right"
-                    }))
-                else:
-                    waiting_players.append({
-                        "channel": self.channel_name,
-                        "nickname": nickname,
-                        "token": token,
-                        "rounds": rounds
-                    })
-                    await self.send(text_data=json.dumps({
-                        "type": "queue_update",
-                        "message": f"Waiting for a player... (Round amount: {rounds})"
-                    }))
+                    state = game.get_state()
+                    last_state = self.last_states.get(room_id)
+                    # get_state reuses its dict, so keep a shallow snapshot
+                    self.last_states[room_id] = dict(state)
                     
-                # Broadcast the updated waiting list to everyone in the lobby
-                await self.broadcast_waiting_list()
-            
-            # Game updates from clients (paddle movement)
-            elif msg_type == "game_update":
-                if data.get("data") and "paddleY" in data.get("data"):
-                    # Update paddle position in server-side game
-                    game_manager.update_paddle(self.channel_name, data["data"]["paddleY"])
-            
-            # Game over notifications (Important for tournaments)
-            elif msg_type == "game_over":
-                # Check if this game was part of a tournament
-                if self.channel_name in tournament_players:
-                    await self.handle_tournament_game_over(self.channel_name)
-            
-            # Tournament game over (specific for tournament matches)
-            elif msg_type == "tournament_game_over":
-                # Handle tournament-specific game over
-                if self.channel_name in tournament_players:
-                    winner_nickname = data.get("winner")
-                    score = data.get("score", 0)
+                    # Send the full state periodically, and only the fields
+                    # that moved in between
+                    if last_state is None or sync_count % self.keyframe_interval == 0:
+                        message = {"type": "game_state_update", "seq": sync_count, "state": state}
+                    else:
+                        delta = state_delta(state, last_state)
+                        if not delta:
+                            continue
+                        message = {"type": "game_state_update", "seq": sync_count, "delta": delta}
                     
-                    # Only process if there's a valid winner
-                    if winner_nickname:
-                        await self.handle_tournament_game_over(self.channel_name)
-            
-            # Tournament commands
-            elif msg_type == "create_tournament":
-                await self.handle_create_tournament(data)
-            elif msg_type == "join_tournament":
-                await self.handle_join_tournament(data)
-            elif msg_type == "start_tournament":
-                await self.handle_start_tournament(data)
-            elif msg_type == "leave_tournament":
-                await self.handle_leave_tournament()
-            elif msg_type == "get_tournaments":
-                await self.broadcast_tournament_list()
-            
-            # New tournament-specific messages
-            elif msg_type == "get_tournament_state":
-                tournament_id = data.get("tournament_id")
-                
-                if tournament_id in active_tournaments:
-                    tournament = active_tournaments[tournament_id]
-                    await self.send(text_data=json.dumps({
-                        "type": "tournament_update",
-                        "tournament": tournament.get_state()
-                    }))
-            
-            elif msg_type == "leave_queue":
-                
-                # Now use waiting_players
-                # Find and remove player from waiting list
-                waiting_players[:] = [p for p in waiting_players if p["channel"] != self.channel_name]
-                logger.info(f"Player {self.channel_name} left the queue")
-                
-                # Update the waiting list count metric if using metrics
-                if len(waiting_players) > 0:
-                    WAITING_PLAYERS.dec()
-                
-                # Send confirmation to client
-                await self.send(text_data=json.dumps({
-                    "type": "queue_update",
-                    "message": "You have left the queue"
-                }))
-                
-                # Broadcast updated waiting list to everyone in the lobby
-                await self.broadcast_waiting_list()
-            
-            elif msg_type == "request_final_match":
-                tournament_id = data.get("tournament_id")
-                
-                if tournament_id in active_tournaments:
-                    tournament = active_tournaments[tournament_id]
+                    # The channel layer copies or serializes the event before
+                    # group_send returns, and the previous tick's sends have all
+                    # completed, so each room reuses one event dict
+                    event = self.events.get(room_id)
+                    if event is None:
+                        event = self.events[room_id] = {"type": "game_state_frame"}
                     
-                    # Force tournament to advance if possible
-                    if tournament.advance_tournament():
-                        logger.info(f"Forced tournament {tournament_id} to advance to next match")
-                        
-                        # Notify all players in tournament about the update
-                        for player in tournament.players:
-                            try:
-                                await self.channel_layer.send(
-                                    player["channel"],
-                                    {
-                                        "type": "tournament_update",
-                                        "tournament": tournament.get_state()
-                                    }
-                                )
-                            except Exception as e:
-                                logger.error(f"Error sending tournament update: {e}")
-                        
-                        # If there's a current match, start it
-                        if tournament.current_match:
-                            await self.start_tournament_match(tournament, tournament.current_match)
+                    # Serialized once here rather than by each recipient, and
+                    # only in the formats the room's members asked for; binary
+                    # clients always get the full state, it is smaller than a delta
+                    binary_count = room_binary_counts.get(room_id, 0)
+                    if binary_count < len(room_members[room_id]):
+                        event["text"] = dumps(message)
                     else:
-                        logger.warning(f"Failed to force tournament {tournament_id} to advance")
-            
-            elif msg_type == "ready_for_match":
-                tournament_id = data.get("tournament_id")
-                nickname = data.get("nickname")
-                
-                if tournament_id in active_tournaments:
-                    tournament = active_tournaments[tournament_id]
-                    
-                    # If no current match but we can find a ready match, set it
-                    if not tournament.current_match:
-                        # Try to find a match that has this player
-                        potential_match = None
-                        for match in tournament.matches:
-                            if (match["player1"] == nickname or match["player2"] == nickname) and match["winner"] is None:
-                                if match["player1"] and match["player2"] and match["player1_channel"] and match["player2_channel"]:
-                                    potential_match = match
-                                    break
-                        
-                        if potential_match:
-                            logger.info(f"Setting match with {nickname} as current match")
-                            tournament.current_match = potential_match
-                            
-                            # Notify all players in tournament about the update
-                            for player in tournament.players:
-                                try:
-                                    await self.channel_layer.send(
-                                        player["channel"],
-                                        {
-                                            "type": "tournament_update",
-                                            "tournament": tournament.get_state()
-                                        }
-                                    )
-                                except Exception as e:
-                                    logger.error(f"Error sending tournament update: {e}")
-                            
-                            # Start the match
-                            await self.start_tournament_match(tournament, tournament.current_match)
-            
-            # Client disconnect notification - graceful exit
-            elif msg_type == "client_disconnect":
-                logger.info(f"Client requested disconnect: {self.channel_name}")
-                # No additional action needed, disconnect handler will clean up
-            
-            # Get initial state after reconnect
-            elif msg_type == "get_state":
-                # Send waiting list
-                await self.send(text_data=json.dumps({
-                    "type": "waiting_list",
-                    "waiting_list": [
-                        {"nickname": p["nickname"], "rounds": p["rounds"]}
-                        for p in waiting_players
-                    ]
-                }))
+                        event.pop("text", None)
+                    if binary_count:
+                        event["bytes"] = encode_state_frame(sync_count, state)
+                    else:
+                        event.pop("bytes", None)
+                    sends.append(channel_layer.group_send(room_id, event))
                 
-                # Send tournament list
-                await self.broadcast_tournament_list()
+                # All rooms are pushed concurrently in one pass
+                await gather_sends(sends)
                 
-                # If player is in a tournament, send tournament state
-                if self.channel_name in tournament_players:
-                    tournament_id = tournament_players[self.channel_name]
-                    if tournament_id in active_tournaments:
-                        tournament = active_tournaments[tournament_id]
-                        await self.send(text_data=json.dumps({
-                            "type": "tournament_update",
-                            "tournament": tournament.get_state()
-                        }))
+                # Log performance metrics occasionally
+                sync_count += 1
+                if sync_count % 150 == 0:  # Log every ~5 seconds
+                    fps = sync_count / (time.time() - start_time)
+                    logger.debug("Game sync stats: %d rooms, %.1f FPS", len(self.rooms), fps)
                 
-                # If player is in a game, need to reconnect them
-                game = game_manager.get_game_for_player(self.channel_name)
-                if game:
-                    # Re-add to game group
-                    await self.channel_layer.group_add(game.room_id, self.channel_name)
-                    
-                    # Send current game state
-                    await self.send(text_data=json.dumps({
-                        "type": "game_state_update",
-                        "state": game.get_state()
-                    }))
-        
-        except json.JSONDecodeError:
-            logger.error("Invalid JSON received")
+                # Wait for next update, skipping ticks we fell behind on
+                deadline += self.interval
+                delay = deadline - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    deadline = loop.time()
+                    await asyncio.sleep(0)
+        except asyncio.CancelledError:
+            logger.info("Game sync loop cancelled")
+            raise
         except Exception as e:
-            logger.error(f"Error processing message: {e}")
+            logger.error(f"Error in game sync loop: {e}")
             # Add traceback for better debugging
             import traceback
             logger.error(traceback.format_exc())
-
-    #----------------
-    # Tournament Methods
-    #----------------
+        finally:
+            self.task = None
+            
+            # Rooms still registered here will never be synced again, so
+            # don't leave their players subscribed to the room groups
+            abandoned = list(self.rooms)
+            for room_id in abandoned:
+                self.remove_room(room_id)
+            await gather_sends(
+                channel_layer.group_discard(room_id, channel)
+                for room_id in abandoned
+                for channel in tuple(room_members.get(room_id, ()))
+            )
     
-    async def handle_create_tournament(self, data):
-        """Handle tournament creation request"""
-        global active_tournaments, tournament_players
+    def remove_room(self, room_id):
+        """Stop syncing a room and record how long it ran"""
+        self.games.pop(room_id, None)
+        self.last_states.pop(room_id, None)
+        self.events.pop(room_id, None)
+        start_time = self.rooms.pop(room_id, None)
+        if start_time is None:
+            return
         
-        nickname = data.get("nickname")
-        tournament_name = data.get("name", f"{nickname}'s Tournament")
-        rounds = data.get("rounds", 3)
-        size = data.get("size", 8)
+        duration = time.time() - start_time
+        logger.info(f"Game in room {room_id} ran for {duration:.2f} seconds")
+        
+        # Assume 'classic' mode if not specified
+        record_metric(lambda: GAME_DURATION.labels(mode='classic').observe(duration))
+
+
+# Shared driver for all game state syncing
+game_sync_driver = GameSyncDriver()
+
+
+async def release_channel(channel_layer, channel_name):
+    """Remove a departed channel from the queue, its game and its tournament, notifying the others"""
+    # Cleanup below updates state right away; the channel layer
+    # notifications don't depend on each other and are sent together
+    sends = []
+    
+    # Remove from waiting players
+    remove_waiting_player(channel_name)
+    
+    # Broadcast updated waiting list
+    sends.append(broadcast_waiting_list(channel_layer))
+    
+    # Handle game room leave
+    game_room = active_games.get(channel_name)
+    if game_room:
+        # Remove player from server-side game
+        game_manager.remove_player_from_game(channel_name)
+        
+        sends.append(channel_layer.group_discard(game_room, channel_name))
+        
+        # Notify opponents in the same game room and take them out of it;
+        # their game stops once nobody is left in it
+        for channel in room_members.get(game_room, set()) - {channel_name}:
+            sends.append(channel_layer.send(channel, {
+                "type": "opponent_left",
+                "message": "Your opponent has disconnected."
+            }))
+            game_manager.remove_player_from_game(channel)
+            sends.append(channel_layer.group_discard(game_room, channel))
+            untrack_game_room(channel)
+        
+        # Remove the departed channel from active games
+        untrack_game_room(channel_name)
+    
+    # Handle tournament cleanup when player disconnects, dropping its tracking
+    tournament_id = tournament_players.pop(channel_name, None)
+    if tournament_id is not None:
+        logger.info(f"Player in tournament {tournament_id} is disconnecting")
+        
+        tournament = active_tournaments.get(tournament_id)
+        if tournament is not None:
+            
+            # If this was the creator and tournament hasn't started, remove it entirely
+            if tournament.creator_channel == channel_name and not tournament.started:
+                logger.info(f"Creator left tournament {tournament_id} - removing tournament")
+                
+                # Notify all players in this tournament and delete it
+                sends.append(cancel_tournament(channel_layer, tournament, channel_name))
+            else:
+                # Leaving during a match forfeits it; the result goes out
+                # like any other, and the next match is started
+                forfeit = None
+                opponent = tournament.current_opponent(channel_name)
+                if opponent is not None:
+                    forfeit = tournament.record_match_result(opponent)
+                
+                # Remove this player from the tournament
+                if tournament.remove_player(channel_name):
+                    logger.info(f"Removed player from tournament {tournament_id}")
+                    sends.append(channel_layer.group_discard(tournament.group_name, channel_name))
+                    
+                    # Notify other tournament players about the update
+                    if forfeit:
+                        sends.append(finish_tournament_match(channel_layer, tournament, forfeit))
+                    else:
+                        sends.append(schedule_tournament_update(channel_layer, tournament))
+                    
+                    # If tournament is now empty, remove it
+                    if not tournament.players:
+                        logger.info(f"Tournament {tournament_id} is now empty - removing")
+                        del active_tournaments[tournament_id]
+        
+        # Broadcast updated tournament list
+        sends.append(broadcast_tournament_list(channel_layer))
+    
+    # Remove from lobby group
+    sends.append(channel_layer.group_discard("lobby", channel_name))
+    
+    await gather_sends(sends)
+
+
+async def finish_tournament_match(channel_layer, tournament, result):
+    """Send a recorded match result to the players and start the next match"""
+    # Send result notifications
+    
+    sends = [
+        # Notify winner
+        channel_layer.send(
+            result["winner_channel"],
+            {
+                "type": "tournament_match_result",
+                "won": True,
+                "opponent": result["loser"],
+                "tournament_complete": result["tournament_complete"]
+            }
+        ),
+        # Notify loser - show tournament elimination
+        channel_layer.send(
+            result["loser_channel"],
+            {
+                "type": "tournament_eliminated",
+                "winner": result["winner"]
+            }
+        )
+    ]
+    
+    # If tournament is complete, notify all players; the winner's
+    # consumer turns this into a victory notification
+    if result["tournament_complete"]:
+        sends.append(channel_layer.group_send(tournament.group_name, {
+            "type": "tournament_complete",
+            "winner": result["winner"],
+            "winner_channel": result["winner_channel"]
+        }))
+    
+    await gather_sends(sends)
+    
+    # Notify all tournament players of the update
+    await broadcast_tournament_update(channel_layer, tournament)
+    
+    # If there's a next match, start it
+    if tournament.current_match:
+        await start_tournament_match(channel_layer, tournament, tournament.current_match)
+
+
+async def start_tournament_match(channel_layer, tournament, match):
+    """Start a match within a tournament"""
+    player1_channel = match["player1_channel"]
+    player2_channel = match["player2_channel"]
+    player1_nickname = match["player1"]
+    player2_nickname = match["player2"]
+    
+    logger.info(f"Starting tournament match: {player1_nickname} vs {player2_nickname}")
+    
+    # Create a new game room for this match
+    tourney_game_room = f"tourney_game_{uuid.uuid4().hex}"
+    
+    # Create server-side game
+    game = game_manager.create_game(tourney_game_room, target_rounds=tournament.rounds)
+
+    
+    # Add players to the game
+    game_manager.add_player_to_game(tourney_game_room, player1_channel, "left")
+    game_manager.add_player_to_game(tourney_game_room, player2_channel, "right")
+    
+    logger.info(f"Added players to tournament game: left={player1_channel}, right={player2_channel}")
+    
+    # Add to channel group
+    await gather_sends([
+        channel_layer.group_add(tourney_game_room, player1_channel),
+        channel_layer.group_add(tourney_game_room, player2_channel)
+    ])
+    
+    # Store room mapping
+    track_game_room(player1_channel, tourney_game_room)
+    track_game_room(player2_channel, tourney_game_room)
+    
+    # Start game for both players - only the side differs between them
+    tournament.reset_match_acks(tourney_game_room)
+    start_message = {
+        "type": "start_game",
+        "message": f"Tournament match: {player1_nickname} vs {player2_nickname}",
+        "room": tourney_game_room,
+        "rounds": tournament.rounds,
+        "is_tournament": True
+    }
+    
+    await gather_sends([
+        channel_layer.send(player1_channel, {**start_message, "player_side": "left"}),
+        channel_layer.send(player2_channel, {**start_message, "player_side": "right"})
+    ])
+    
+    # Start the game once both clients report their UI is ready. This runs
+    # as its own task so this consumer can keep processing messages,
+    # including its own player's acknowledgement. A match that was
+    # forfeited before it started no longer needs its task.
+    if tournament.match_start_task is not None:
+        tournament.match_start_task.cancel()
+    tournament.match_start_task = asyncio.create_task(
+        start_tournament_game_when_ready(tournament, tourney_game_room)
+    )
+
+
+async def start_tournament_game_when_ready(tournament, tourney_game_room):
+    """Start a tournament game after both players acknowledged the match"""
+    try:
+        await asyncio.wait_for(tournament.match_ack_event.wait(), timeout=MATCH_ACK_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning(f"Match acknowledgement timed out for {tourney_game_room}, starting anyway")
+    finally:
+        if tournament.match_start_task is asyncio.current_task():
+            tournament.match_start_task = None
+    
+    # The acks may have been for a later match that replaced this one
+    if tournament.match_room != tourney_game_room:
+        return
+    
+    success = game_manager.start_game(tourney_game_room)
+    if not success:
+        logger.error(f"Failed to start tournament game: {tourney_game_room}")
+        return
+    logger.info(f"Tournament game started: {success}")
+    # Set up state sync loop for this game
+    game_sync_driver.add_room(tourney_game_room)
+
+
+async def broadcast_tournament_update(channel_layer, tournament):
+    """Send the current tournament state to every player in the tournament"""
+    # The tournament changed, so its lobby entry may have too
+    invalidate_tournament_list()
+    
+    try:
+        await channel_layer.group_send(tournament.group_name, {
+            "type": "send_prebuilt",
+            "text": tournament.get_update_text()
+        })
+    except Exception as e:
+        logger.error(f"Error sending tournament update: {e}")
+
+
+async def schedule_tournament_update(channel_layer, tournament):
+    """Broadcast a tournament's roster change, coalescing bursts before it starts"""
+    # Once started, updates go out right away to stay ahead of match messages
+    if tournament.started:
+        await broadcast_tournament_update(channel_layer, tournament)
+        return
+    
+    tournament.update_dirty = True
+    if tournament.update_task is None:
+        tournament.update_task = asyncio.create_task(flush_tournament_update(channel_layer, tournament))
+
+
+async def flush_tournament_update(channel_layer, tournament):
+    """Broadcast a tournament's state after the debounce delay, until it stops changing"""
+    try:
+        while tournament.update_dirty:
+            await asyncio.sleep(TOURNAMENT_UPDATE_DEBOUNCE)
+            tournament.update_dirty = False
+            
+            # Nobody is left to tell about a canceled or emptied tournament
+            if active_tournaments.get(tournament.id) is not tournament:
+                break
+            await broadcast_tournament_update(channel_layer, tournament)
+    finally:
+        tournament.update_task = None
+
+
+async def cancel_tournament(channel_layer, tournament, creator_channel):
+    """Delete a tournament and notify the other players that the creator canceled it"""
+    # Delete it before yielding so nobody can join while the notices go out
+    players = tuple(tournament.players)
+    active_tournaments.pop(tournament.id, None)
+    
+    # Remove their tournament tracking; the abandoned group expires in the channel layer
+    for player in players:
+        if player.channel != creator_channel:
+            tournament_players.pop(player.channel, None)
+    
+    # The creator is leaving, so take them out of the group before notifying
+    await channel_layer.group_discard(tournament.group_name, creator_channel)
+    
+    try:
+        await channel_layer.group_send(tournament.group_name, {
+            "type": "send_prebuilt",
+            "text": TOURNAMENT_CANCELED
+        })
+    except Exception as e:
+        logger.error(f"Error notifying players about tournament deletion: {e}")
+
+
+async def broadcast_tournament_list(channel_layer):
+    """Schedule a broadcast of the tournament list to all clients in lobby"""
+    global tournament_list_task, tournament_list_dirty
+    
+    # Bursts of tournament changes collapse into a single broadcast
+    invalidate_tournament_list()
+    tournament_list_dirty = True
+    if tournament_list_task is None:
+        tournament_list_task = asyncio.create_task(flush_tournament_list(channel_layer))
+
+
+async def flush_tournament_list(channel_layer):
+    """Broadcast the tournament list after the debounce delay, until it stops changing"""
+    global tournament_list_task, tournament_list_dirty
+    
+    try:
+        while tournament_list_dirty:
+            await asyncio.sleep(TOURNAMENT_LIST_DEBOUNCE)
+            tournament_list_dirty = False
+            await send_tournament_list(channel_layer)
+    finally:
+        tournament_list_task = None
+
+
+async def send_tournament_list(channel_layer):
+    """Broadcast the current tournament list to all clients in lobby"""
+    logger.debug("Broadcasting tournament list: %d tournaments", len(active_tournaments))
+    
+    try:
+        await channel_layer.group_send("lobby", {
+            "type": "send_prebuilt",
+            "text": get_tournament_list_text()
+        })
+    except Exception as e:
+        logger.error(f"Error broadcasting tournament list: {e}")
+
+
+async def broadcast_waiting_list(channel_layer):
+    """Broadcast waiting list to all clients in lobby"""
+    logger.debug("Broadcasting waiting list: %d players", len(waiting_rounds))
+    
+    try:
+        await channel_layer.group_send("lobby", {
+            "type": "send_prebuilt",
+            "text": get_waiting_list_text()
+        })
+    except Exception as e:
+        logger.error(f"Error broadcasting waiting list: {e}")
+
+
+async def sweep_departed_players():
+    """Periodically release game and tournament entries left behind by departed channels
+    
+    Connected players are never touched, however long they stay quiet.
+    """
+    channel_layer = get_channel_layer()
+    
+    while True:
+        await asyncio.sleep(SWEEP_INTERVAL)
+        
+        try:
+            departed = [
+                channel for channel in set(chain(active_games, tournament_players))
+                if channel not in connected_channels
+            ]
+            
+            for channel in departed:
+                await release_channel(channel_layer, channel)
+            
+            if departed:
+                logger.info(f"Released {len(departed)} departed players")
+        except Exception as e:
+            logger.error(f"Error sweeping departed players: {e}")
+
+
+class PongConsumer(AsyncWebsocketConsumer):
+    async def connect(self):
+        global sweep_task
+        
+        await self.accept()
+        WEBSOCKET_CONNECTIONS.inc()
+        connected_channels.add(self.channel_name)
+        
+        # Outgoing messages are written by one task, see write_messages
+        self.connected = True  # Cleared on disconnect, later messages are dropped
+        self.send_queue = deque()  # Encoded text messages in send order
+        self.binary_state = False  # Whether the client asked for binary state frames
+        self.pending_state = None  # Newest game state frame, latest-wins
+        self.state_resync = False
+        self.send_ready = asyncio.Event()
+        self.writer_task = None
+        
+        if sweep_task is None:
+            sweep_task = asyncio.create_task(sweep_departed_players())
+        
+        # Add every connecting client to a common lobby group
+        await self.channel_layer.group_add("lobby", self.channel_name)
+        logger.info(f"WebSocket connected: {self.channel_name}")
+        
+        # Send waiting list update
+        self.queue_send(get_waiting_list_text())
+        
+        # Send active tournaments list
+        self.queue_send(get_tournament_list_text())
+
+    async def disconnect(self, close_code):
+        WEBSOCKET_CONNECTIONS.dec()
+        connected_channels.discard(self.channel_name)
+        set_binary_state(self.channel_name, False)
+        
+        # Events still arriving for this channel have nobody to go to
+        self.connected = False
+        self.send_queue.clear()
+        self.pending_state = None
+        if self.writer_task:
+            self.writer_task.cancel()
+        logger.info(f"WebSocket disconnecting: {self.channel_name}")
+        
+        await release_channel(self.channel_layer, self.channel_name)
+        logger.info(f"WebSocket disconnected: {self.channel_name}")
+
+    async def receive(self, text_data):
+        try:
+            data = orjson.loads(text_data)
+            msg_type = data.get("type")
+            counter = self.message_counters.get(msg_type)
+            if counter is None:
+                counter = WEBSOCKET_MESSAGES.labels(message_type=msg_type)
+            counter.inc()
+            # Lazy formatting, this runs for every paddle update
+            logger.debug("Received message type: %s", msg_type)
+            
+            handler = self.message_handlers.get(msg_type)
+            if handler:
+                await handler(self, data)
+        
+        except orjson.JSONDecodeError:
+            logger.error("Invalid JSON received")
+        except Exception as e:
+            logger.error(f"Error processing message: {e}")
+            # Add traceback for better debugging
+            import traceback
+            logger.error(traceback.format_exc())
+
+    #----------------
+    # Message Handlers
+    #----------------
+    
+    async def handle_join(self, data):
+        """Regular game matchmaking"""
+        WAITING_PLAYERS.inc()
+        nickname = data.get("nickname")
+        token = data.get("token")
+        rounds = data.get("rounds")
+        logger.info(f"Player {nickname} joined with token: {token} and rounds: {rounds}")
+        
+        # Take the longest-waiting player with the same rounds
+        matching_player = pop_waiting_player(rounds)
+                
+        if matching_player:
+            game_room = f"game_{uuid.uuid4().hex}"
+            
+            # Create server-side game
+            game = game_manager.create_game(game_room, target_rounds=rounds)
+            
+            # Add players to the game
+            game_manager.add_player_to_game(game_room, matching_player.channel, "left")
+            game_manager.add_player_to_game(game_room, self.channel_name, "right")
+            
+            # Add to channel group
+            await self.channel_layer.group_add(game_room, self.channel_name)
+            await self.channel_layer.group_add(game_room, matching_player.channel)
+            
+            # Store room mapping
+            track_game_room(self.channel_name, game_room)
+            track_game_room(matching_player.channel, game_room)
+            
+            # Construct message
+            game_message = f"Game starting between {matching_player.nickname} and {nickname}"
+            
+            # Start the game
+            game_manager.start_game(game_room)
+            
+            # Set up state sync loop for this game
+            game_sync_driver.add_room(game_room)
+            
+            # Notify players - only the side differs between them
+            start_message = {
+                "type": "start_game",
+                "message": game_message,
+                "room": game_room,
+                "rounds": rounds
+            }
+            await self.channel_layer.send(
+                matching_player.channel,
+                {**start_message, "player_side": "left"}
+            )
+            self.queue_send(dumps({**start_message, "player_side": "right"}))
+        else:
+            add_waiting_player(WaitingPlayer(self.channel_name, nickname, token, rounds))
+            self.queue_send(dumps({
+                "type": "queue_update",
+                "message": f"Waiting for a player... (Round amount: {rounds})"
+            }))
+            
+        # Broadcast the updated waiting list to everyone in the lobby
+        await broadcast_waiting_list(self.channel_layer)
+
+    async def handle_game_update(self, data):
+        """Game updates from clients (paddle movement)"""
+        if data.get("data") and "paddleY" in data.get("data"):
+            # Update paddle position in server-side game
+            game_manager.update_paddle(self.channel_name, data["data"]["paddleY"])
+
+    async def handle_game_over(self, data):
+        """Game over notifications (Important for tournaments)"""
+        # Check if this game was part of a tournament
+        if self.channel_name in tournament_players:
+            await self.handle_tournament_game_over(self.channel_name)
+
+    async def handle_tournament_game_over_message(self, data):
+        """Tournament game over (specific for tournament matches)"""
+        if self.channel_name in tournament_players:
+            # Only process if there's a valid winner
+            if data.get("winner"):
+                await self.handle_tournament_game_over(self.channel_name)
+
+    async def handle_get_tournaments(self, data):
+        """Send the tournament list"""
+        self.queue_send(get_tournament_list_text())
+
+    async def handle_get_tournament_state(self, data):
+        """Send the state of a single tournament"""
+        tournament_id = data.get("tournament_id")
+        
+        tournament = active_tournaments.get(tournament_id)
+        if tournament is not None:
+            self.queue_send(tournament.get_update_text())
+
+    async def handle_leave_queue(self, data):
+        """Remove the player from the matchmaking queue"""
+        # Find and remove player from waiting list
+        remove_waiting_player(self.channel_name)
+        logger.info(f"Player {self.channel_name} left the queue")
+        
+        # Update the waiting list count metric if using metrics
+        if waiting_rounds:
+            WAITING_PLAYERS.dec()
+        
+        # Send confirmation to client
+        self.queue_send(dumps({
+            "type": "queue_update",
+            "message": "You have left the queue"
+        }))
+        
+        # Broadcast updated waiting list to everyone in the lobby
+        await broadcast_waiting_list(self.channel_layer)
+
+    async def handle_request_final_match(self, data):
+        """Force a tournament to advance to its next match"""
+        tournament_id = data.get("tournament_id")
+        
+        tournament = active_tournaments.get(tournament_id)
+        if tournament is not None:
+            
+            # Force tournament to advance if possible
+            if tournament.advance_tournament():
+                logger.info(f"Forced tournament {tournament_id} to advance to next match")
+                
+                # Notify all players in tournament about the update
+                await broadcast_tournament_update(self.channel_layer, tournament)
+                
+                # If there's a current match, start it
+                if tournament.current_match:
+                    await start_tournament_match(self.channel_layer, tournament, tournament.current_match)
+            else:
+                logger.warning(f"Failed to force tournament {tournament_id} to advance")
+
+    async def handle_ready_for_match(self, data):
+        """Start a ready match for this player if the tournament has none running"""
+        tournament_id = data.get("tournament_id")
+        nickname = data.get("nickname")
+        
+        tournament = active_tournaments.get(tournament_id)
+        if tournament is not None:
+            
+            # If no current match but we can find a ready match, set it
+            if not tournament.current_match:
+                # Try to find a match that has this player
+                potential_match = None
+                for match in tournament.matches:
+                    if (match["player1"] == nickname or match["player2"] == nickname) and match["winner"] is None:
+                        if match["player1"] and match["player2"] and match["player1_channel"] and match["player2_channel"]:
+                            potential_match = match
+                            break
+                
+                if potential_match:
+                    logger.info(f"Setting match with {nickname} as current match")
+                    tournament.current_match = potential_match
+                    tournament.invalidate_state()
+                    
+                    # Notify all players in tournament about the update
+                    await broadcast_tournament_update(self.channel_layer, tournament)
+                    
+                    # Start the match
+                    await start_tournament_match(self.channel_layer, tournament, tournament.current_match)
+
+    async def handle_tournament_match_ack(self, data):
+        """Client UI is ready for a tournament match"""
+        tournament = active_tournaments.get(tournament_players.get(self.channel_name))
+        if tournament:
+            tournament.ack_match(self.channel_name, data.get("room"))
+
+    async def handle_binary_state(self, data):
+        """Switch game state updates between JSON and binary frames"""
+        enabled = bool(data.get("enabled"))
+        if self.binary_state and not enabled:
+            # Text frames carry deltas, so start from a full state
+            self.state_resync = True
+        self.binary_state = enabled
+        set_binary_state(self.channel_name, enabled)
+
+    async def handle_client_disconnect(self, data):
+        """Client disconnect notification - graceful exit"""
+        logger.info(f"Client requested disconnect: {self.channel_name}")
+        # No additional action needed, disconnect handler will clean up
+
+    async def handle_get_state(self, data):
+        """Get initial state after reconnect"""
+        # Send waiting list
+        self.queue_send(get_waiting_list_text())
+        
+        # Send tournament list
+        self.queue_send(get_tournament_list_text())
+        
+        # If player is in a tournament, send tournament state
+        tournament = active_tournaments.get(tournament_players.get(self.channel_name))
+        if tournament is not None:
+            self.queue_send(tournament.get_update_text())
+        
+        # If player is in a game, need to reconnect them
+        game = game_manager.get_game_for_player(self.channel_name)
+        if game:
+            # Re-add to game group
+            await self.channel_layer.group_add(game.room_id, self.channel_name)
+            track_game_room(self.channel_name, game.room_id)
+            
+            # Send current game state
+            self.queue_send(dumps({
+                "type": "game_state_update",
+                "state": game.get_state()
+            }))
+
+    #----------------
+    # Tournament Methods
+    #----------------
+    
+    async def handle_create_tournament(self, data):
+        """Handle tournament creation request"""
+        nickname = data.get("nickname")
+        tournament_name = data.get("name", f"{nickname}'s Tournament")
+        rounds = data.get("rounds", 3)
+        size = data.get("size", 8)
         
         # Validate tournament size
         if size not in [4, 6, 8]:
-            await self.send(text_data=json.dumps({
-                "type": "tournament_error",
-                "message": "Tournament size must be 4, 6, or 8 players"
-            }))
+            self.queue_send(ERROR_INVALID_SIZE)
             return
             
         logger.info(f"Creating tournament: {tournament_name} by {nickname} with {size} players")
         
         # Create new tournament
-        tournament_id = str(uuid.uuid4())
+        tournament_id = uuid.uuid4().hex
         tournament = Tournament(tournament_id, self.channel_name, tournament_name, size)
         tournament.rounds = rounds
         
@@ -1072,55 +1660,45 @@ class PongConsumer(AsyncWebsocketConsumer):
         # Store tournament
         active_tournaments[tournament_id] = tournament
         tournament_players[self.channel_name] = tournament_id
+        await self.channel_layer.group_add(tournament.group_name, self.channel_name)
         
         # Respond to creator
-        await self.send(text_data=json.dumps({
+        self.queue_send(dumps({
             "type": "tournament_created",
             "tournament": tournament.get_state()
         }))
         
         # Broadcast updated tournament list
-        await self.broadcast_tournament_list()
+        await broadcast_tournament_list(self.channel_layer)
         
         # Record tournament metrics
         TOURNAMENT_CREATED.inc()
 
     async def handle_join_tournament(self, data):
         """Handle tournament join request"""
-        global active_tournaments, tournament_players
-        
         tournament_id = data.get("tournament_id")
         nickname = data.get("nickname")
         
         logger.info(f"Player {nickname} attempting to join tournament {tournament_id}")
         
-        if tournament_id not in active_tournaments:
-            await self.send(text_data=json.dumps({
-                "type": "tournament_error",
-                "message": "Tournament not found"
-            }))
+        tournament = active_tournaments.get(tournament_id)
+        if tournament is None:
+            self.queue_send(ERROR_TOURNAMENT_NOT_FOUND)
             return
-            
-        tournament = active_tournaments[tournament_id]
         
         # Don't allow joining started tournaments
         if tournament.started:
-            await self.send(text_data=json.dumps({
-                "type": "tournament_error",
-                "message": "Cannot join: Tournament has already started"
-            }))
+            self.queue_send(ERROR_ALREADY_STARTED)
             return
         
         # Add player to tournament
         if not tournament.add_player(self.channel_name, nickname):
-            await self.send(text_data=json.dumps({
-                "type": "tournament_error",
-                "message": "Cannot join tournament. It might be full or nickname is already taken."
-            }))
+            self.queue_send(ERROR_CANNOT_JOIN)
             return
         
         # Track which tournament this player is in
         tournament_players[self.channel_name] = tournament_id
+        await self.channel_layer.group_add(tournament.group_name, self.channel_name)
         
         logger.info(f"Player {nickname} joined tournament {tournament_id}")
         
@@ -1128,50 +1706,31 @@ class PongConsumer(AsyncWebsocketConsumer):
         TOURNAMENT_PLAYERS.observe(len(tournament.players))
         
         # Send tournament state to the new player
-        await self.send(text_data=json.dumps({
+        self.queue_send(dumps({
             "type": "tournament_joined",
             "tournament": tournament.get_state()
         }))
         
         # Notify all players in tournament
-        for player in tournament.players:
-            try:
-                await self.channel_layer.send(
-                    player["channel"],
-                    {
-                        "type": "tournament_update",
-                        "tournament": tournament.get_state()
-                    }
-                )
-            except Exception as e:
-                logger.error(f"Error sending tournament update: {e}")
+        await schedule_tournament_update(self.channel_layer, tournament)
         
         # Broadcast updated tournament list
-        await self.broadcast_tournament_list()
+        await broadcast_tournament_list(self.channel_layer)
 
     async def handle_start_tournament(self, data):
         """Handle tournament start request"""
-        global active_tournaments, tournament_players
-        
         tournament_id = data.get("tournament_id")
         
         logger.info(f"Request to start tournament {tournament_id}")
         
-        if tournament_id not in active_tournaments:
-            await self.send(text_data=json.dumps({
-                "type": "tournament_error",
-                "message": "Tournament not found"
-            }))
+        tournament = active_tournaments.get(tournament_id)
+        if tournament is None:
+            self.queue_send(ERROR_TOURNAMENT_NOT_FOUND)
             return
-            
-        tournament = active_tournaments[tournament_id]
         
         # Only creator can start tournament
         if self.channel_name != tournament.creator_channel:
-            await self.send(text_data=json.dumps({
-                "type": "tournament_error",
-                "message": "Only the tournament creator can start the tournament"
-            }))
+            self.queue_send(ERROR_NOT_CREATOR)
             return
         
         # Start the tournament
@@ -1180,133 +1739,76 @@ class PongConsumer(AsyncWebsocketConsumer):
             player_count = len(tournament.players)
             
             if player_count < 4:
-                message = "Cannot start: Need at least 4 players"
+                error = ERROR_NEED_PLAYERS
             elif player_count not in [4, 6, 8]:
-                message = "Cannot start: Tournament requires 4, 6, or 8 players"
+                error = ERROR_INVALID_PLAYER_COUNT
             elif player_count % 2 != 0:
-                message = "Cannot start: Need an even number of players"
+                error = ERROR_ODD_PLAYER_COUNT
             else:
-                message = "Cannot start tournament"
+                error = ERROR_CANNOT_START
             
-            await self.send(text_data=json.dumps({
-                "type": "tournament_error",
-                "message": message
-            }))
+            self.queue_send(error)
             return
         
         logger.info(f"Tournament {tournament_id} started successfully")
         
         # Notify all players
-        for player in tournament.players:
-            try:
-                await self.channel_layer.send(
-                    player["channel"],
-                    {
-                        "type": "tournament_update",
-                        "tournament": tournament.get_state()
-                    }
-                )
-            except Exception as e:
-                logger.error(f"Error sending tournament update: {e}")
+        await broadcast_tournament_update(self.channel_layer, tournament)
         
         # If there's a current match, start it
         if tournament.current_match:
-            await self.start_tournament_match(tournament, tournament.current_match)
+            await start_tournament_match(self.channel_layer, tournament, tournament.current_match)
         
         # Broadcast updated tournament list
-        await self.broadcast_tournament_list()
+        await broadcast_tournament_list(self.channel_layer)
 
-    async def handle_leave_tournament(self):
+    async def handle_leave_tournament(self, data=None):
         """Handle player leaving a tournament"""
-        global active_tournaments, tournament_players
-        
-        if self.channel_name not in tournament_players:
-            await self.send(text_data=json.dumps({
-                "type": "tournament_error",
-                "message": "You are not in a tournament"
-            }))
+        tournament_id = tournament_players.get(self.channel_name)
+        if tournament_id is None:
+            self.queue_send(ERROR_NOT_IN_TOURNAMENT)
             return
-            
-        tournament_id = tournament_players[self.channel_name]
         
         logger.info(f"Player leaving tournament {tournament_id}")
         
-        if tournament_id not in active_tournaments:
+        tournament = active_tournaments.get(tournament_id)
+        if tournament is None:
             # Clean up tracking even if tournament doesn't exist
             del tournament_players[self.channel_name]
-            await self.send(text_data=json.dumps({
-                "type": "tournament_left",
-                "message": "You have left the tournament"
-            }))
+            self.queue_send(TOURNAMENT_LEFT)
             return
-            
-        tournament = active_tournaments[tournament_id]
         
         # If leaving player is creator and tournament hasn't started, delete it
         if self.channel_name == tournament.creator_channel and not tournament.started:
             logger.info(f"Tournament creator left, removing tournament {tournament_id}")
             
-            # Notify other players
-            for player in tournament.players:
-                if player["channel"] != self.channel_name:
-                    try:
-                        await self.channel_layer.send(
-                            player["channel"],
-                            {
-                                "type": "tournament_left",
-                                "message": "Tournament has been canceled by the creator."
-                            }
-                        )
-                        # Remove their tournament tracking
-                        if player["channel"] in tournament_players:
-                            del tournament_players[player["channel"]]
-                    except Exception as e:
-                        logger.error(f"Error notifying player about tournament deletion: {e}")
-            
-            # Delete the tournament
-            del active_tournaments[tournament_id]
+            # Notify other players and delete the tournament
+            await cancel_tournament(self.channel_layer, tournament, self.channel_name)
         else:
             # Remove player from tournament
             tournament.remove_player(self.channel_name)
+            await self.channel_layer.group_discard(tournament.group_name, self.channel_name)
             
             # Notify other tournament players
-            for player in tournament.players:
-                try:
-                    await self.channel_layer.send(
-                        player["channel"],
-                        {
-                            "type": "tournament_update",
-                            "tournament": tournament.get_state()
-                        }
-                    )
-                except Exception as e:
-                    logger.error(f"Error sending tournament update: {e}")
+            await schedule_tournament_update(self.channel_layer, tournament)
             
             # Remove tournament if empty
             if not tournament.players:
                 logger.info(f"Tournament {tournament_id} is now empty, removing")
                 del active_tournaments[tournament_id]
         
-        # Remove from tracking
-        del tournament_players[self.channel_name]
+        # Remove from tracking; a creator's cancel may already have dropped it
+        tournament_players.pop(self.channel_name, None)
         
         # Notify player they left
-        await self.send(text_data=json.dumps({
-            "type": "tournament_left",
-            "message": "You have left the tournament"
-        }))
+        self.queue_send(TOURNAMENT_LEFT)
         
         # Broadcast updated tournament list
-        await self.broadcast_tournament_list()
+        await broadcast_tournament_list(self.channel_layer)
 
     async def handle_tournament_game_over(self, winner_channel):
         """Handle completion of a tournament game"""
-        global active_tournaments, tournament_players
-        
-        if winner_channel not in tournament_players:
-            return False
-            
-        tournament_id = tournament_players[winner_channel]
+        tournament_id = tournament_players.get(winner_channel)
         tournament = active_tournaments.get(tournament_id)
         
         if not tournament or not tournament.current_match:
@@ -1321,192 +1823,16 @@ class PongConsumer(AsyncWebsocketConsumer):
             
         logger.info(f"Match result recorded, winner: {result['winner']}")
         
-        # Send result notifications
-        
-        # Notify winner
-        await self.channel_layer.send(
-            result["winner_channel"],
-            {
-                "type": "tournament_match_result",
-                "won": True,
-                "opponent": result["loser"],
-                "tournament_complete": result["tournament_complete"]
-            }
-        )
-        
-        # Notify loser - show tournament elimination
-        await self.channel_layer.send(
-            result["loser_channel"],
-            {
-                "type": "tournament_eliminated",
-                "winner": result["winner"]
-            }
-        )
-        
-        # If tournament is complete, notify all players
-        if result["tournament_complete"]:
-            # Get all players in the tournament
-            for player in tournament.players:
-                # Skip winner (already notified)
-                if player["channel"] == result["winner_channel"]:
-                    # Send tournament victory notification
-                    await self.channel_layer.send(
-                        player["channel"],
-                        {
-                            "type": "tournament_victory"
-                        }
-                    )
-                    continue
-                    
-                # Notify everyone else about the winner
-                await self.channel_layer.send(
-                    player["channel"],
-                    {
-                        "type": "tournament_complete",
-                        "winner": result["winner"]
-                    }
-                )
-        
-        # Notify all tournament players of the update
-        for player in tournament.players:
-            try:
-                await self.channel_layer.send(
-                    player["channel"],
-                    {
-                        "type": "tournament_update",
-                        "tournament": tournament.get_state()
-                    }
-                )
-            except Exception as e:
-                logger.error(f"Error sending tournament update: {e}")
-        
-        # If there's a next match, start it
-        if tournament.current_match:
-            await self.start_tournament_match(tournament, tournament.current_match)
-        
+        await finish_tournament_match(self.channel_layer, tournament, result)
         return True
 
-    async def start_tournament_match(self, tournament, match):
-        """Start a match within a tournament"""
-        player1_channel = match["player1_channel"]
-        player2_channel = match["player2_channel"]
-        player1_nickname = match["player1"]
-        player2_nickname = match["player2"]
-        
-        logger.info(f"Starting tournament match: {player1_nickname} vs {player2_nickname}")
-        
-        # Create a new game room for this match
-        tourney_game_room = "tourney_game_" + str(uuid.uuid4())
-        
-        # Create server-side game
-        game = game_manager.create_game(tourney_game_room, target_rounds=tournament.rounds)
-
-        
-        # Add players to the game
-        game_manager.add_player_to_game(tourney_game_room, player1_channel, "left")
-        game_manager.add_player_to_game(tourney_game_room, player2_channel, "right")
-        
-        logger.info(f"Added players to tournament game: left={player1_channel}, right={player2_channel}")
-        
-        # Add to channel group
-        await self.channel_layer.group_add(tourney_game_room, player1_channel)
-        await self.channel_layer.group_add(tourney_game_room, player2_channel)
-        
-        # Store room mapping
-        active_games[player1_channel] = tourney_game_room
-        active_games[player2_channel] = tourney_game_room
-        
-        # Start the game with a small delay to ensure players are ready
-        await asyncio.sleep(0.5)
-        success = game_manager.start_game(tourney_game_room)
-        if not success:
-            logger.error(f"Failed to start tournament game: {tourney_game_room}")
-            return
-        logger.info(f"Tournament game started: {success}")
-        # Set up state sync loop for this game
-        asyncio.create_task(self.game_sync_loop(tourney_game_room))
-        
-        # Start game for both players
-        match_message = f"Tournament match: {player1_nickname} vs {player2_nickname}"
-        
-        await self.channel_layer.send(
-            player1_channel,
-            {
-                "type": "start_game",
-                "message": match_message,
-                "room": tourney_game_room,
-                "rounds": tournament.rounds,
-                "is_tournament": True,
-                "player_side": "left"
-            }
-        )
-        
-        # Add small delay between messages to prevent race conditions
-        await asyncio.sleep(0.1)
-        
-        await self.channel_layer.send(
-            player2_channel,
-            {
-                "type": "start_game",
-                "message": match_message,
-                "room": tourney_game_room,
-                "rounds": tournament.rounds,
-                "is_tournament": True,
-                "player_side": "right"
-            }
-        )
-
-    async def broadcast_tournament_list(self):
-        """Broadcast the current tournament list to all clients in lobby"""
-        # Build list of active tournaments
-        tournament_list = [
-            {
-                "id": t_id,
-                "name": tournament.name,
-                "players": len(tournament.players),
-                "size": tournament.size,
-                "started": tournament.started
-            }
-            for t_id, tournament in active_tournaments.items()
-            if not tournament.started or tournament.current_match is not None
-        ]
-        
-        logger.debug(f"Broadcasting tournament list: {len(tournament_list)} tournaments")
-        
-        try:
-            await self.channel_layer.group_send("lobby", {
-                "type": "tournament_list_update",
-                "tournaments": tournament_list
-            })
-        except Exception as e:
-            logger.error(f"Error broadcasting tournament list: {e}")
-
-    async def broadcast_waiting_list(self):
-        """Broadcast waiting list to all clients in lobby"""
-        waiting_list = [{"nickname": p["nickname"], "rounds": p["rounds"]} for p in waiting_players]
-        logger.debug(f"Broadcasting waiting list: {len(waiting_list)} players")
-        
-        try:
-            await self.channel_layer.group_send("lobby", {
-                "type": "waiting_list_update",
-                "waiting_list": waiting_list
-            })
-        except Exception as e:
-            logger.error(f"Error broadcasting waiting list: {e}")
+    async def send_prebuilt(self, event):
+        """Send a message the sender already serialized for every recipient"""
+        self.queue_send(event["text"])
 
-    async def waiting_list_update(self, event):
-        """Send waiting list update to connected client"""
-        waiting_list = event.get("waiting_list", [])
-        logger.debug(f"Sending waiting list update: {len(waiting_list)} players")
-        
-        await self.send(text_data=json.dumps({
-            "type": "waiting_list",
-            "waiting_list": waiting_list
-        }))
-    
     async def tournament_match_result(self, event):
         """Send tournament match result to client"""
-        await self.send(text_data=json.dumps({
+        self.queue_send(dumps({
             "type": "tournament_match_result",
             "won": event.get("won", False),
             "opponent": event.get("opponent"),
@@ -1515,188 +1841,159 @@ class PongConsumer(AsyncWebsocketConsumer):
     
     async def tournament_eliminated(self, event):
         """Send tournament elimination notification to client"""
-        await self.send(text_data=json.dumps({
+        self.queue_send(dumps({
             "type": "tournament_eliminated",
             "winner": event.get("winner")
         }))
     
     async def tournament_victory(self, event):
         """Send tournament victory notification to client"""
-        await self.send(text_data=json.dumps({
+        self.queue_send(dumps({
             "type": "tournament_victory"
         }))
     
     async def tournament_complete(self, event):
         """Send tournament completion notification to client"""
-        await self.send(text_data=json.dumps({
+        if event.get("winner_channel") == self.channel_name:
+            await self.tournament_victory(event)
+            return
+        
+        self.queue_send(dumps({
             "type": "tournament_complete",
             "winner": event.get("winner")
         }))
     
-    async def tournament_list_update(self, event):
-        """Send updated tournament list to client"""
-        tournaments = event.get("tournaments", [])
+    async def start_game(self, event):
+        """Send start game event to client"""
+        logger.debug("Sending start game event: %s", event.get('message'))
+        
+        # Fields the event doesn't carry are left out rather than sent as null
+        message = {"type": "start_game"}
+        for key in ("message", "room", "rounds"):
+            value = event.get(key)
+            if value is not None:
+                message[key] = value
+        message["is_tournament"] = event.get("is_tournament", False)
+        message["player_side"] = event.get("player_side", "left")
+        self.queue_send(dumps(message))
         
-        await self.send(text_data=json.dumps({
-            "type": "tournament_list",
-            "tournaments": tournaments
-        }))
-    
-    async def tournament_update(self, event):
-        """Distribute tournament update to connected client"""
-        tournament = event.get("tournament")
-        logger.debug(f"Sending tournament update for tournament {tournament['id'] if tournament else 'unknown'}")
+        game_mode = event.get("game_mode", "classic")
+        record_metric(lambda: record_game_started(game_mode))
         
-        await self.send(text_data=json.dumps({
-            "type": "tournament_update",
-            "tournament": tournament
-        }))
-    
-    async def tournament_left(self, event):
-        """Notify client they left or were removed from a tournament"""
-        message = event.get("message", "You have left the tournament")
-        logger.debug(f"Sending tournament left message: {message}")
+    async def game_state_frame(self, event):
+        """Queue a pre-serialized game state frame, replacing any frame not yet sent"""
+        if not self.connected:
+            return
         
-        await self.send(text_data=json.dumps({
-            "type": "tournament_left",
-            "message": message
-        }))
+        # A slow client only ever has the newest frame waiting, so it never
+        # falls behind the game
+        if self.binary_state and "bytes" in event:
+            self.pending_state = event["bytes"]
+        elif "text" in event:
+            if self.pending_state is not None:
+                # The replaced frame may have carried changes the new delta lacks
+                self.state_resync = True
+            self.pending_state = event["text"]
+        else:
+            # Switched formats after this tick was encoded; the next one has ours
+            return
+        self.wake_writer()
 
-    async def game_sync_loop(self, game_room):
-        """Periodically send game state to clients"""
-        
-        logger.info(f"Starting game sync loop for room: {game_room}")
+    def queue_send(self, text):
+        """Queue an encoded text message for the writer task"""
+        if not self.connected:
+            return
         
-        try:
-            # Track when we start the game sync
-            start_time = time.time()
-            sync_count = 0
+        self.send_queue.append(text)
+        self.wake_writer()
+
+    def wake_writer(self):
+        """Signal the writer task, starting it on first use"""
+        self.send_ready.set()
+        if self.writer_task is None:
+            self.writer_task = asyncio.create_task(self.write_messages())
+
+    async def write_messages(self):
+        """Send everything queued since the last write, batched into few frames"""
+        while True:
+            await self.send_ready.wait()
+            self.send_ready.clear()
             
-            while True:
-                # Get game instance
-                game = game_manager.active_games.get(game_room)
-                
-                # Debug game instance lookup
-                if not game:
-                    logger.error(f"Game not found in game_manager.active_games for room: {game_room}")
-                    # Check if the room exists in the global dictionary for additional debugging
-                    is_in_global = game_room in [room for room in active_games.values()]
-                    logger.error(f"Room {game_room} exists in global active_games: {is_in_global}")
-                    break
-                    
-                if not game.is_running:
-                    logger.info(f"Game in room {game_room} is no longer running")
-                    # Check if game has a winner and notify players
-                    if game.winner:
-                        logger.info(f"Game in room {game_room} has winner: {game.winner}")
-                        # Determine scores to send
-                        if game.winner == "left":
-                            winner_score = game.left_score
-                            winner = "left"
-                        else:
-                            winner_score = game.right_score
-                            winner = "right"
-                        # Send game over notification
-                        await self.channel_layer.group_send(
-                            game_room,
-                            {
-                                "type": "broadcast_game_over",
-                                "score": winner_score,
-                                "winner": winner
-                            }
-                        )
-                        logger.info(f"Game over notification sent for room {game_room}")
-                    else:
-                        logger.warning(f"Game in room {game_room} stopped without a winner")
-                    break
-                
-                # Get current game state
-                state = game.get_state()
-                
-                # Increment sync counter
-                sync_count += 1
-                
-                # Log performance metrics occasionally
-                if sync_count % 300 == 0:  # Log every ~5 seconds
-                    elapsed = time.time() - start_time
-                    fps = sync_count / elapsed
-                    logger.debug(f"Game sync stats for room {game_room}: {sync_count} updates, {fps:.1f} FPS")
-                
-                # Send to all players in this game room
-                await self.channel_layer.group_send(
-                    game_room,
-                    {
-                        "type": "game_state_update",
-                        "state": state
-                    }
-                )
-                
-                # Wait for next update
-                await asyncio.sleep(1/60)  # ~ 60 FPS
-        except asyncio.CancelledError:
-            logger.info(f"Game sync loop cancelled for room: {game_room}")
-        except Exception as e:
-            logger.error(f"Error in game sync loop for room {game_room}: {e}")
-            # Add traceback for better debugging
-            import traceback
-            logger.error(traceback.format_exc())
-        finally:
-            logger.info(f"Game sync loop ended for room: {game_room}")
+            frame = self.pending_state
+            self.pending_state = None
             
-            # Record game duration if applicable
-            if start_time:
-                duration = time.time() - start_time
-                logger.info(f"Game in room {game_room} ran for {duration:.2f} seconds")
+            try:
+                batch = []
+                if isinstance(frame, bytes):
+                    await self.send(bytes_data=frame)
+                elif frame is not None:
+                    # After dropping a frame send the full current state instead
+                    if self.state_resync:
+                        self.state_resync = False
+                        game = game_manager.get_game_for_player(self.channel_name)
+                        if game:
+                            frame = dumps({"type": "game_state_update", "state": game.get_state()})
+                    batch.append(frame)
                 
-                # If we have metrics integration, record the duration
-                try:
-                    # Assume 'classic' mode if not specified
-                    GAME_DURATION.labels(mode='classic').observe(duration)
-                except Exception as metrics_error:
-                    # Don't let metrics recording failure affect the game
-                    logger.warning(f"Failed to record game metrics: {metrics_error}")
+                # Messages queued while the last frame was being written go out together
+                while self.send_queue:
+                    batch.append(self.send_queue.popleft())
+                    if len(batch) == SEND_BATCH:
+                        await self.send_batch(batch)
+                        batch = []
+                if batch:
+                    await self.send_batch(batch)
+            except Exception as e:
+                logger.error(f"Error sending messages: {e}")
 
-    async def start_game(self, event):
-        """Send start game event to client"""
-        logger.debug(f"Sending start game event: {event.get('message')}")
-        
-        await self.send(text_data=json.dumps({
-            "type": "start_game",
-            "message": event.get("message"),
-            "room": event.get("room"),
-            "rounds": event.get("rounds"),
-            "is_tournament": event.get("is_tournament", False),
-            "player_side": event.get("player_side", "left")
-        }))
-        
-        game_mode = event.get("game_mode", "classic")
-        GAME_STARTED.labels(mode=game_mode).inc()
-        WAITING_PLAYERS.dec()
-        ACTIVE_PLAYERS.inc()
-        
-    async def game_state_update(self, event):
-        """Send game state update to client"""
-        logger.debug(f"Sending game state update")
-        await self.send(text_data=json.dumps({
-            "type": "game_state_update",
-            "state": event.get("state")
-        }))
+    async def send_batch(self, batch):
+        """Send encoded messages as one frame, a JSON array when there are several"""
+        if len(batch) == 1:
+            await self.send(text_data=batch[0])
+        else:
+            await self.send(text_data="[" + ",".join(batch) + "]")
 
     async def broadcast_game_over(self, event):
         """Send game over notification to client"""
-        await self.send(text_data=json.dumps({
+        self.queue_send(dumps({
             "type": "game_over",
             "score": event.get("score"),
             "winner": event.get("winner")
         }))
         
         game_mode = event.get("game_mode", "classic")
-        GAME_COMPLETED.labels(mode=game_mode).inc()
-        ACTIVE_PLAYERS.dec()
+        record_metric(lambda: record_game_completed(game_mode))
 
     async def opponent_left(self, event):
         """Send opponent left notification to client"""
-        await self.send(text_data=json.dumps({
+        self.queue_send(dumps({
             "type": "opponent_left",
             "message": event.get("message")
-        }))
\ No newline at end of file
+        }))
+
+    # Client message type -> handler, looked up once per received message
+    message_handlers = {
+        "join": handle_join,
+        "game_update": handle_game_update,
+        "game_over": handle_game_over,
+        "tournament_game_over": handle_tournament_game_over_message,
+        "create_tournament": handle_create_tournament,
+        "join_tournament": handle_join_tournament,
+        "start_tournament": handle_start_tournament,
+        "leave_tournament": handle_leave_tournament,
+        "get_tournaments": handle_get_tournaments,
+        "get_tournament_state": handle_get_tournament_state,
+        "leave_queue": handle_leave_queue,
+        "request_final_match": handle_request_final_match,
+        "ready_for_match": handle_ready_for_match,
+        "tournament_match_ack": handle_tournament_match_ack,
+        "binary_state": handle_binary_state,
+        "client_disconnect": handle_client_disconnect,
+        "get_state": handle_get_state,
+    }
+    
+    # Message counter for each handled type, resolved once instead of per message
+    message_counters = {
+        msg_type: WEBSOCKET_MESSAGES.labels(message_type=msg_type)
+        for msg_type in message_handlers
+    }
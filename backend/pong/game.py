@@ -1,20 +1,98 @@
-import time
 import math
+import asyncio
 import random
-import threading
 import logging
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Score codes returned by step_ball
+SCORE_NONE = 0
+SCORE_LEFT = 1
+SCORE_RIGHT = 2
+
+MAX_BOUNCE_ANGLE = math.pi / 4  # Steepest bounce off a paddle edge (45 degrees)
+
+MAX_CATCH_UP_FRAMES = 5  # Most frames the ticker runs back to back after a stall
+
+
+def step_ball(bx, by, vx, vy, lpy, rpy, speed, width, height, radius,
+              paddle_width, paddle_height, speed_increment):
+    """
+    Advance the ball by one fixed-length frame.
+    
+    Movement, wall bounces and paddle collisions are handled in one pass over
+    plain local values, so the game state is read once and written once per
+    frame instead of going through several attribute-heavy method calls.
+    Returns (ball_x, ball_y, ball_vx, ball_vy, ball_speed, score_code).
+    """
+    # Move ball
+    bx += vx
+    by += vy
+    
+    # Ball collision with top and bottom walls, one range check per frame
+    bottom = height - radius
+    if not radius <= by <= bottom:
+        vy = -vy
+        by = radius if by < radius else bottom
+    
+    # Most frames the ball is in mid-field, clear of both paddle columns,
+    # so a single X-range check per side skips everything below
+    left_edge = bx - radius
+    if left_edge < paddle_width:
+        # Ball off the left edge - the scoring side resets the ball,
+        # so there is nothing left to collide with this frame
+        if left_edge < 0:
+            return bx, by, vx, vy, speed, SCORE_RIGHT
+        
+        # Left paddle collision
+        if lpy < by < lpy + paddle_height:
+            # Hit position relative to paddle center (-1 to 1), max ±45 degrees
+            half_paddle = paddle_height * 0.5
+            bounce_angle = (by - (lpy + half_paddle)) / half_paddle * MAX_BOUNCE_ANGLE
+            speed += speed_increment
+            vx = abs(speed * math.cos(bounce_angle))
+            vy = speed * math.sin(bounce_angle)
+            # Move ball outside paddle to prevent multiple collisions
+            bx = paddle_width + radius
+        return bx, by, vx, vy, speed, SCORE_NONE
+    
+    right_edge = bx + radius
+    if right_edge > width - paddle_width:
+        # Ball off the right edge
+        if right_edge > width:
+            return bx, by, vx, vy, speed, SCORE_LEFT
+        
+        # Right paddle collision
+        if rpy < by < rpy + paddle_height:
+            half_paddle = paddle_height * 0.5
+            bounce_angle = (by - (rpy + half_paddle)) / half_paddle * MAX_BOUNCE_ANGLE
+            speed += speed_increment
+            vx = -abs(speed * math.cos(bounce_angle))
+            vy = speed * math.sin(bounce_angle)
+            bx = width - paddle_width - radius
+    
+    return bx, by, vx, vy, speed, SCORE_NONE
+
+
 class PongGame:
     """
     Server-side implementation of Pong game logic.
     """
+    __slots__ = (
+        "room_id", "target_rounds", "win_score", "on_game_over", "game_start_time",
+        "width", "height",
+        "is_running", "left_score", "right_score", "winner",
+        "ball_radius", "ball_x", "ball_y", "ball_speed", "ball_vx", "ball_vy",
+        "paddle_width", "paddle_height", "left_paddle_y", "right_paddle_y", "paddle_speed",
+        "pending_paddles", "left_player", "right_player", "speed_increment", "state",
+    )
+    
     def __init__(self, room_id, target_rounds=3, on_game_over=None):
         # Game identification
         self.room_id = room_id
         self.target_rounds = target_rounds
+        self.win_score = (target_rounds + 1) // 2  # Points needed to win, a majority of the rounds
         self.on_game_over = on_game_over
         self.game_start_time = None
         
@@ -43,12 +121,10 @@ class PongGame:
         self.right_paddle_y = (self.height - self.paddle_height) / 2
         self.paddle_speed = 7
         
-        # Game loop properties
-        self.fps = 60
-        self.frame_duration = 1.0 / self.fps
-        self.last_frame_time = 0
-        self.game_thread = None
-        self.lock = threading.Lock()
+        # Latest paddle position from each client, applied by the game loop at
+        # the start of each frame. Newer input overwrites older, so a burst of
+        # messages costs one paddle move per frame.
+        self.pending_paddles = {}  # Maps channel_name to requested paddle y
         
         # Player connections
         self.left_player = None
@@ -57,210 +133,234 @@ class PongGame:
         # Special features
         self.speed_increment = 0.2
         
+        # State dict handed out by get_state, reused between calls
+        self.state = {
+            "ball": {"x": self.ball_x, "y": self.ball_y, "radius": self.ball_radius},
+            "paddles": {
+                "left": {"y": self.left_paddle_y, "width": self.paddle_width, "height": self.paddle_height},
+                "right": {"y": self.right_paddle_y, "width": self.paddle_width, "height": self.paddle_height}
+            },
+            "score": {"left": self.left_score, "right": self.right_score},
+            "dimensions": {"width": self.width, "height": self.height}
+        }
+        
         logger.info(f"Game created: room={room_id}, rounds={target_rounds}")
 
     def add_player(self, channel_name, player_side=None):
         """Add a player to the game"""
-        with self.lock:
-            if player_side == "left" or (player_side is None and self.left_player is None):
-                self.left_player = channel_name
-                return "left"
-            elif player_side == "right" or (player_side is None and self.right_player is None):
-                self.right_player = channel_name
-                return "right"
-            else:
-                return None  # No space for player
+        if player_side == "left" or (player_side is None and self.left_player is None):
+            self.left_player = channel_name
+            return "left"
+        elif player_side == "right" or (player_side is None and self.right_player is None):
+            self.right_player = channel_name
+            return "right"
+        else:
+            return None  # No space for player
 
     def remove_player(self, channel_name):
         """Remove a player from the game"""
-        with self.lock:
-            if self.left_player == channel_name:
-                self.left_player = None
-                return True
-            elif self.right_player == channel_name:
-                self.right_player = None
-                return True
-            return False
+        if self.left_player == channel_name:
+            self.left_player = None
+            return True
+        elif self.right_player == channel_name:
+            self.right_player = None
+            return True
+        return False
 
     def update_paddle(self, channel_name, y_position):
-        """Update paddle position for a player"""
-        with self.lock:
-            # Validate y_position is within bounds
-            y_position = max(0, min(self.height - self.paddle_height, y_position))
-            
+        """Record a player's requested paddle position for the next frame"""
+        # Positions come straight from the client, so only finite numbers
+        # are queued; the game loop must never see anything else
+        try:
+            y_position = float(y_position)
+        except (TypeError, ValueError):
+            logger.debug("Dropping invalid paddle position from %s: %r", channel_name, y_position)
+            return False
+        if not math.isfinite(y_position):
+            logger.debug("Dropping invalid paddle position from %s: %r", channel_name, y_position)
+            return False
+        
+        # Validate y_position is within bounds
+        self.pending_paddles[channel_name] = max(0, min(self.height - self.paddle_height, y_position))
+        return True
+
+    def apply_paddle_updates(self):
+        """Apply pending paddle updates (called by the game loop)"""
+        pending = self.pending_paddles
+        if not pending:
+            return
+        
+        for channel_name, y_position in pending.items():
             if channel_name == self.left_player:
                 self.left_paddle_y = y_position
             elif channel_name == self.right_player:
                 self.right_paddle_y = y_position
+        pending.clear()
 
     def reset_ball(self):
         """Reset ball to center with random direction"""
         self.ball_x = self.width / 2
         self.ball_y = self.height / 2
-        angle = random.uniform(-math.pi/4, math.pi/4)
+        angle = random.uniform(-MAX_BOUNCE_ANGLE, MAX_BOUNCE_ANGLE)
         # Ensure ball goes towards player who didn't score
         direction = 1 if self.ball_vx < 0 else -1
         self.ball_vx = self.ball_speed * math.cos(angle) * direction
         self.ball_vy = self.ball_speed * math.sin(angle)
 
     def start(self):
-        """Start the game loop"""
+        """Start stepping the game (must be called from the event loop)"""
         if self.is_running:
             return False
         
         self.is_running = True
         self.game_start_time = datetime.now()
-        self.game_thread = threading.Thread(target=self.game_loop)
-        self.game_thread.daemon = True
-        self.game_thread.start()
+        game_ticker.add(self)
         
         logger.info(f"Game started: room={self.room_id}")
         return True
 
     def stop(self):
-        """Stop the game loop"""
+        """Stop stepping the game"""
         self.is_running = False
-        if self.game_thread:
-            self.game_thread = None
+        game_ticker.remove(self)
         logger.info(f"Game stopped: room={self.room_id}")
 
-    def game_loop(self):
-        """Main game loop"""
-        self.last_frame_time = time.time()
+    def update(self):
+        """Advance the game state by one frame"""
+        # Apply paddle movement received since the last frame
+        self.apply_paddle_updates()
         
-        while self.is_running:
-            current_time = time.time()
-            delta_time = current_time - self.last_frame_time
-            
-            # Only update if enough time has passed for next frame
-            if delta_time >= self.frame_duration:
-                self.update(delta_time)
-                self.last_frame_time = current_time
-            else:
-                # Sleep a bit to avoid consuming too much CPU
-                time.sleep(0.001)
-
-    def update(self, delta_time):
-        """Update game state for one frame"""
-        with self.lock:
-            # Apply delta time factor for smooth movement regardless of frame rate
-            delta_factor = delta_time / self.frame_duration
-            
-            # Move ball
-            self.ball_x += self.ball_vx * delta_factor
-            self.ball_y += self.ball_vy * delta_factor
-            
-            # Ball collision with top and bottom walls
-            if self.ball_y - self.ball_radius < 0 or self.ball_y + self.ball_radius > self.height:
-                self.ball_vy = -self.ball_vy
-                # Ensure ball stays in bounds
-                if self.ball_y - self.ball_radius < 0:
-                    self.ball_y = self.ball_radius
-                else:
-                    self.ball_y = self.height - self.ball_radius
-            
-            # Check for scoring (ball off left/right edge)
-            if self.ball_x - self.ball_radius < 0:
-                # Right player scores
-                self.right_score += 1
-                self.check_game_over()
-                self.reset_ball()
-            elif self.ball_x + self.ball_radius > self.width:
-                # Left player scores
-                self.left_score += 1
-                self.check_game_over()
-                self.reset_ball()
-            
-            # Check for paddle collisions
-            self.check_paddle_collisions()
-
-    def check_paddle_collisions(self):
-        """Check and handle ball collisions with paddles"""
-        # Left paddle collision
-        if (self.ball_x - self.ball_radius < self.paddle_width and 
-            self.ball_y > self.left_paddle_y and 
-            self.ball_y < self.left_paddle_y + self.paddle_height):
-            
-            # Calculate hit position relative to paddle center (-1 to 1)
-            hit_pos = (self.ball_y - (self.left_paddle_y + self.paddle_height/2)) / (self.paddle_height/2)
-            
-            # Calculate bounce angle (maximum ±75 degrees)
-            bounce_angle = hit_pos * (math.pi/4)  # π/4 radians = 45 degrees
-            
-            # Increase ball speed
-            self.ball_speed += self.speed_increment
-            
-            # Set new velocity
-            self.ball_vx = abs(self.ball_speed * math.cos(bounce_angle))
-            self.ball_vy = self.ball_speed * math.sin(bounce_angle)
-            
-            # Move ball outside paddle to prevent multiple collisions
-            self.ball_x = self.paddle_width + self.ball_radius
+        # Move, bounce and collide the ball in a single pass
+        (self.ball_x, self.ball_y, self.ball_vx, self.ball_vy,
+         self.ball_speed, scored) = step_ball(
+            self.ball_x, self.ball_y, self.ball_vx, self.ball_vy,
+            self.left_paddle_y, self.right_paddle_y, self.ball_speed,
+            self.width, self.height, self.ball_radius,
+            self.paddle_width, self.paddle_height,
+            self.speed_increment
+        )
         
-        # Right paddle collision
-        elif (self.ball_x + self.ball_radius > self.width - self.paddle_width and 
-              self.ball_y > self.right_paddle_y and 
-              self.ball_y < self.right_paddle_y + self.paddle_height):
-            
-            # Calculate hit position relative to paddle center (-1 to 1)
-            hit_pos = (self.ball_y - (self.right_paddle_y + self.paddle_height/2)) / (self.paddle_height/2)
-            
-            # Calculate bounce angle (maximum ±75 degrees)
-            bounce_angle = hit_pos * (math.pi/4)  # π/4 radians = 45 degrees
-            
-            # Increase ball speed
-            self.ball_speed += self.speed_increment
-            
-            # Set new velocity
-            self.ball_vx = -abs(self.ball_speed * math.cos(bounce_angle))
-            self.ball_vy = self.ball_speed * math.sin(bounce_angle)
-            
-            # Move ball outside paddle to prevent multiple collisions
-            self.ball_x = self.width - self.paddle_width - self.ball_radius
+        # Check for scoring (ball off left/right edge)
+        if scored == SCORE_RIGHT:
+            # Right player scores
+            self.right_score += 1
+            self.check_game_over()
+            self.reset_ball()
+        elif scored == SCORE_LEFT:
+            # Left player scores
+            self.left_score += 1
+            self.check_game_over()
+            self.reset_ball()
 
     def check_game_over(self):
         """Check if the game is over"""
-        if self.left_score >= self.target_rounds / 2:
+        if self.left_score >= self.win_score:
             self.winner = "left"
             self.is_running = False
             if self.on_game_over:
                 self.on_game_over(self)
-        elif self.right_score >= self.target_rounds / 2:
+        elif self.right_score >= self.win_score:
             self.winner = "right"
             self.is_running = False
             if self.on_game_over:
                 self.on_game_over(self)
 
     def get_state(self):
-        """Get the current game state as a dict"""
-        with self.lock:
-            return {
-                "ball": {
-                    "x": self.ball_x,
-                    "y": self.ball_y,
-                    "radius": self.ball_radius
-                },
-                "paddles": {
-                    "left": {
-                        "y": self.left_paddle_y,
-                        "width": self.paddle_width,
-                        "height": self.paddle_height
-                    },
-                    "right": {
-                        "y": self.right_paddle_y,
-                        "width": self.paddle_width,
-                        "height": self.paddle_height
-                    }
-                },
-                "score": {
-                    "left": self.left_score,
-                    "right": self.right_score
-                },
-                "dimensions": {
-                    "width": self.width,
-                    "height": self.height
-                }
-            }
+        """Get the current game state as a dict
+        
+        The same dict is returned every call. A section (ball, paddles, score)
+        is swapped for a new dict only when its values change, so a shallow
+        copy is enough to keep a snapshot.
+        """
+        state = self.state
+        
+        # Clients draw whole pixels; a tenth of one keeps the JSON short
+        ball_x = round(self.ball_x, 1)
+        ball_y = round(self.ball_y, 1)
+        ball = state["ball"]
+        if ball["x"] != ball_x or ball["y"] != ball_y:
+            state["ball"] = {"x": ball_x, "y": ball_y, "radius": self.ball_radius}
+        
+        paddles = state["paddles"]
+        left = paddles["left"]
+        right = paddles["right"]
+        if left["y"] != self.left_paddle_y or right["y"] != self.right_paddle_y:
+            if left["y"] != self.left_paddle_y:
+                left = {"y": self.left_paddle_y, "width": self.paddle_width, "height": self.paddle_height}
+            if right["y"] != self.right_paddle_y:
+                right = {"y": self.right_paddle_y, "width": self.paddle_width, "height": self.paddle_height}
+            state["paddles"] = {"left": left, "right": right}
+        
+        score = state["score"]
+        if score["left"] != self.left_score or score["right"] != self.right_score:
+            state["score"] = {"left": self.left_score, "right": self.right_score}
+        
+        return state
+
+
+class GameTicker:
+    """
+    Steps the physics of every running game from a single task
+    """
+    def __init__(self, fps=60):
+        self.frame_duration = 1.0 / fps
+        self.games = set()  # Running PongGame instances
+        self.task = None
+    
+    def add(self, game):
+        """Start stepping a game, starting the shared loop if it is idle"""
+        self.games.add(game)
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self.run())
+    
+    def remove(self, game):
+        """Stop stepping a game"""
+        self.games.discard(game)
+    
+    async def run(self):
+        """Advance every game by whole frames until none are left
+        
+        Elapsed time is measured on the loop's monotonic clock and
+        accumulated, so games keep real-time pace even when a wakeup is late.
+        """
+        loop = asyncio.get_running_loop()
+        frame_duration = self.frame_duration
+        max_lag = MAX_CATCH_UP_FRAMES * frame_duration
+        last_time = loop.time()
+        lag = 0.0
+        
+        try:
+            while self.games:
+                # Sleep until the next whole frame is due
+                await asyncio.sleep(frame_duration - lag)
+                
+                current_time = loop.time()
+                lag += current_time - last_time
+                last_time = current_time
+                
+                # After a long stall catch up a few frames at most, dropping the rest
+                if lag > max_lag:
+                    lag = max_lag
+                
+                while lag >= frame_duration:
+                    for game in tuple(self.games):
+                        if not game.is_running:
+                            self.games.discard(game)
+                            continue
+                        
+                        try:
+                            game.update()
+                        except Exception as e:
+                            # One broken game must not stall the others
+                            logger.error(f"Error updating game: room={game.room_id}, error={e}")
+                            game.stop()
+                    lag -= frame_duration
+        finally:
+            self.task = None
+
+
+# Shared ticker for all game physics
+game_ticker = GameTicker()
 
 
 class GameManager:
@@ -270,90 +370,82 @@ class GameManager:
     def __init__(self):
         self.active_games = {}  # Maps room_id to PongGame instance
         self.player_games = {}  # Maps player channel_name to room_id
-        self.lock = threading.Lock()
     
     def create_game(self, room_id, target_rounds=3):
         """Create a new game"""
-        with self.lock:
-            if room_id in self.active_games:
-                return self.active_games[room_id]
-            
-            game = PongGame(
-                room_id=room_id,
-                target_rounds=target_rounds,
-                on_game_over=self.handle_game_over
-            )
-            self.active_games[room_id] = game
-            return game
+        if room_id in self.active_games:
+            return self.active_games[room_id]
+        
+        game = PongGame(
+            room_id=room_id,
+            target_rounds=target_rounds,
+            on_game_over=self.handle_game_over
+        )
+        self.active_games[room_id] = game
+        return game
     
     def add_player_to_game(self, room_id, channel_name, player_side=None):
         """Add a player to a game"""
-        with self.lock:
-            game = self.active_games.get(room_id)
-            if not game:
-                return None
-            
-            side = game.add_player(channel_name, player_side)
-            if side:
-                self.player_games[channel_name] = room_id
-            return side
+        game = self.active_games.get(room_id)
+        if not game:
+            return None
+        
+        side = game.add_player(channel_name, player_side)
+        if side:
+            self.player_games[channel_name] = room_id
+        return side
     
     def remove_player_from_game(self, channel_name):
         """Remove a player from their game"""
-        with self.lock:
-            room_id = self.player_games.get(channel_name)
-            if not room_id:
-                return False
-            
-            game = self.active_games.get(room_id)
-            if not game:
-                return False
-            
-            result = game.remove_player(channel_name)
-            if result:
-                del self.player_games[channel_name]
-                
-                # Check if game is now empty
-                if game.left_player is None and game.right_player is None:
-                    game.stop()
-                    del self.active_games[room_id]
+        room_id = self.player_games.get(channel_name)
+        if not room_id:
+            return False
+        
+        game = self.active_games.get(room_id)
+        if not game:
+            return False
+        
+        result = game.remove_player(channel_name)
+        if result:
+            del self.player_games[channel_name]
             
-            return result
+            # Check if game is now empty
+            if game.left_player is None and game.right_player is None:
+                game.stop()
+                del self.active_games[room_id]
+        
+        return result
     
     def update_paddle(self, channel_name, y_position):
         """Update paddle position for a player"""
-        with self.lock:
-            room_id = self.player_games.get(channel_name)
-            if not room_id:
-                return False
-            
-            game = self.active_games.get(room_id)
-            if not game:
-                return False
-            
-            game.update_paddle(channel_name, y_position)
-            return True
+        room_id = self.player_games.get(channel_name)
+        if not room_id:
+            return False
+        
+        game = self.active_games.get(room_id)
+        if not game:
+            return False
+        
+        return game.update_paddle(channel_name, y_position)
     
     def get_game_for_player(self, channel_name):
         """Get the game instance for a player"""
-        with self.lock:
-            room_id = self.player_games.get(channel_name)
-            if not room_id:
-                return None
-            
-            return self.active_games.get(room_id)
+        room_id = self.player_games.get(channel_name)
+        if not room_id:
+            return None
+        
+        return self.active_games.get(room_id)
     
     def start_game(self, room_id):
         """Start a game if both players are ready"""
-        with self.lock:
-            game = self.active_games.get(room_id)
-            if not game:
-                return False
-            
-            if game.left_player and game.right_player:
-                return game.start()
-            
+        game = self.active_games.get(room_id)
+        if not game:
             return False
+        
+        if game.left_player and game.right_player:
+            return game.start()
+        
+        return False
     
     def handle_game_over(self, game):
         """Handle game over event"""
@@ -362,16 +454,7 @@ class GameManager:
         logger.info(f"Game over: room={game.room_id}, winner={game.winner}")
         
         # Schedule cleanup after a delay (would use proper cleanup mechanism in production)
-        def delayed_cleanup():
-            time.sleep(5)  # 5 second delay before cleanup
-            with self.lock:
-                if game.room_id in self.active_games:
-                    del self.active_games[game.room_id]
-        
-        # Start cleanup thread
-        cleanup_thread = threading.Thread(target=delayed_cleanup)
-        cleanup_thread.daemon = True
-        cleanup_thread.start()
+        asyncio.get_running_loop().call_later(5, self.active_games.pop, game.room_id, None)
 
 # Create a global game manager instance
 game_manager = GameManager()
\ No newline at end of file
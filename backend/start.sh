@@ -19,8 +19,8 @@ python populate_db.py
 # Start server with or without SSL
 if [ "$SSL_ENABLED" = "true" ]; then
   echo "Starting with SSL on port 8443"
-  daphne -e ssl:8443:privateKey=$SSL_KEY_FILE:certKey=$SSL_CERT_FILE backend.asgi:application -b 0.0.0.0 -p 8000
+  python daphne_uvloop.py -e ssl:8443:privateKey=$SSL_KEY_FILE:certKey=$SSL_CERT_FILE backend.asgi:application -b 0.0.0.0 -p 8000
 else
   echo "Starting without SSL on port 8000"
-  daphne backend.asgi:application -b 0.0.0.0 -p 8000
+  python daphne_uvloop.py backend.asgi:application -b 0.0.0.0 -p 8000
 fi
\ No newline at end of file
@@ -14,6 +14,11 @@ const ServerPong = (function() {
     let paddleUpdateThrottle = 16; // ms between paddle updates (60fps)
     let lastPaddleUpdateTime = 0;
     
+    // The server sends ~30 state updates per second; the ball is drawn
+    // moving from the previous update's position to the latest one
+    let previousBall = null;
+    let updateInterval = 33; // ms between the last two state updates
+    
     // Configuration
     const config = {
         rounds: 3,
@@ -386,8 +391,12 @@ const ServerPong = (function() {
         
         // Store previous state for interpolation if needed
         const previousState = gameState;
+        
+        if (previousState && previousState.ball && state.ball) {
+            previousBall = previousState.ball;
+            updateInterval = Math.min(100, Math.max(1, state.lastUpdateTime - previousState.lastUpdateTime));
+        }
 
-        console.log("Received game state update:", state);
         // Update game state
         gameState = state;
         
@@ -415,6 +424,27 @@ const ServerPong = (function() {
         }
     }
     
+    /**
+     * Apply a partial game state update from server
+     * @param {Object} delta - State fields that changed, ball and paddles carry only positions
+     */
+    function applyGameStateDelta(delta) {
+        // Wait for a full state to apply the changes to
+        if (!delta || !gameState) return;
+        
+        const state = { ...gameState, ...delta };
+        if (delta.ball) {
+            state.ball = { ...gameState.ball, ...delta.ball };
+        }
+        if (delta.paddles) {
+            state.paddles = {
+                left: { ...gameState.paddles.left, ...delta.paddles.left },
+                right: { ...gameState.paddles.right, ...delta.paddles.right }
+            };
+        }
+        updateGameState(state);
+    }
+    
     /**
      * Update paddle position (send to server)
      * @param {number} y - Paddle Y position
@@ -501,11 +531,21 @@ const ServerPong = (function() {
         
         // Draw ball
         if (gameState.ball) {
+            let ballX = gameState.ball.x;
+            let ballY = gameState.ball.y;
+            
+            // Interpolate between updates, except across a reset to center
+            if (previousBall && Math.abs(ballX - previousBall.x) < gameState.dimensions.width / 4) {
+                const t = Math.min(1, (Date.now() - gameState.lastUpdateTime) / updateInterval);
+                ballX = previousBall.x + (ballX - previousBall.x) * t;
+                ballY = previousBall.y + (ballY - previousBall.y) * t;
+            }
+            
             ctx.fillStyle = config.ballColor;
             ctx.beginPath();
             ctx.arc(
-                gameState.ball.x * scaleX, 
-                gameState.ball.y * scaleY, 
+                ballX * scaleX, 
+                ballY * scaleY, 
                 gameState.ball.radius * scaleX,
                 0, Math.PI * 2
             );
@@ -599,6 +639,7 @@ const ServerPong = (function() {
         start,
         stop,
         updateGameState,
+        applyGameStateDelta,
         getState,
         setPlayerSide,
         toggleFps
@@ -18,6 +18,7 @@ const WebSocketManager = (function() {
   const MAX_RECONNECT_ATTEMPTS = 5;
   const RECONNECT_DELAY = 3000; // 3 seconds
   const PADDLE_UPDATE_THROTTLE = 16; // ~30fps max for paddle updates
+  const STATE_SCALE = 32; // Sub-pixel steps per pixel in binary state frames
   
   // WebSocket URL based on current location
   const WS_URL = (() => {
@@ -101,12 +102,16 @@ const WebSocketManager = (function() {
     }
     
     ws = new WebSocket(WS_URL);
+    ws.binaryType = "arraybuffer";
     
     ws.onopen = () => {
       console.log("WebSocket connected to lobby");
       isConnected = true;
       reconnectAttempts = 0;
       
+      // Ask for compact binary game state frames
+      send({ type: "binary_state", enabled: true });
+      
       // Notify any listeners about the connection
       if (gameCallbacks.onConnect) {
         gameCallbacks.onConnect();
@@ -154,34 +159,74 @@ const WebSocketManager = (function() {
     };
   }
   
+  /**
+   * Decode a binary game state frame (layout matches STATE_FRAME on the server)
+   * @param {ArrayBuffer} buffer - The binary frame
+   * @returns {Object} Game state in the same shape as the JSON state
+   */
+  function decodeStateFrame(buffer) {
+    const view = new DataView(buffer);
+    // Positions are sent as int16 in 1/STATE_SCALE pixels
+    const pos = (offset) => view.getInt16(offset, true) / STATE_SCALE;
+    const u16 = (offset) => view.getUint16(offset, true);
+    
+    return {
+      ball: { x: pos(4), y: pos(6), radius: pos(8) },
+      paddles: {
+        left: { y: pos(10), width: pos(12), height: pos(14) },
+        right: { y: pos(16), width: pos(18), height: pos(20) }
+      },
+      score: { left: u16(22), right: u16(24) },
+      dimensions: { width: u16(26), height: u16(28) }
+    };
+  }
+  
   /**
    * Handle incoming WebSocket messages
    * @param {MessageEvent} event - The WebSocket message event
    */
   function handleMessage(event) {
-    try {
-      const data = JSON.parse(event.data);
-      
-      // Only log important messages to reduce console spam
-      if (data.type !== 'game_update' && data.type !== 'game_state_update') {
-        console.log("WebSocket message received:", data);
-      }
-      
-      // If page is not visible, queue important messages for later processing
-      if (document.visibilityState !== 'visible') {
-        if (['start_game', 'game_over', 'opponent_left', 'tournament_update'].includes(data.type)) {
-          console.log("Page not visible, queueing important message:", data);
-          pendingMessages.push(data);
-          return;
-        }
+    // Binary frames only ever carry game state
+    if (event.data instanceof ArrayBuffer) {
+      if (window.ServerPong) {
+        window.ServerPong.updateGameState(decodeStateFrame(event.data));
       }
+      return;
+    }
+    
+    try {
+      const parsed = JSON.parse(event.data);
       
-      processMessage(data);
+      // The server batches messages sent close together into one array frame
+      const messages = Array.isArray(parsed) ? parsed : [parsed];
+      messages.forEach(handleParsedMessage);
     } catch (error) {
       console.error("Error parsing WebSocket message:", error);
     }
   }
   
+  /**
+   * Handle a single message from an incoming frame
+   * @param {Object} data - Parsed message data
+   */
+  function handleParsedMessage(data) {
+    // Only log important messages to reduce console spam
+    if (data.type !== 'game_update' && data.type !== 'game_state_update') {
+      console.log("WebSocket message received:", data);
+    }
+    
+    // If page is not visible, queue important messages for later processing
+    if (document.visibilityState !== 'visible') {
+      if (['start_game', 'game_over', 'opponent_left', 'tournament_update'].includes(data.type)) {
+        console.log("Page not visible, queueing important message:", data);
+        pendingMessages.push(data);
+        return;
+      }
+    }
+    
+    processMessage(data);
+  }
+  
   /**
    * Process a parsed WebSocket message based on its type
    * @param {Object} data - Parsed message data
@@ -270,6 +315,11 @@ const WebSocketManager = (function() {
               data.room || null,
               data.player_side || 'left'
             );
+            
+            // Tournament matches start on the server once both players are ready
+            if (data.is_tournament) {
+              send({ type: "tournament_match_ack", room: data.room });
+            }
           }, 100);
         }
       },
@@ -287,7 +337,12 @@ const WebSocketManager = (function() {
       // New handler for server-side game state updates
       game_state_update: () => {
         if (window.ServerPong) {
-          window.ServerPong.updateGameState(data.state);
+          // Between full states the server only sends the fields that changed
+          if (data.delta) {
+            window.ServerPong.applyGameStateDelta(data.delta);
+          } else {
+            window.ServerPong.updateGameState(data.state);
+          }
         }
       },
       